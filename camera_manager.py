@@ -1,13 +1,36 @@
 import depthai as dai
 import cv2
 import numpy as np
+import os
 import threading
+import queue
 import time
+from collections import deque
 from typing import Optional, Tuple, Callable, List, Dict
-from datetime import datetime
+from datetime import datetime, timedelta
 
 
 class CameraManager:
+    # Output streams the camera thread waits on
+    OUTPUT_QUEUES = ["rgb_video", "h264", "depth", "left"]
+
+    # UI preview size, derived on the host from the high-res video stream
+    PREVIEW_SIZE = (640, 480)
+
+    # Streams recorded to video and how many frames each may buffer
+    VIDEO_STREAMS = ('rgb', 'depth', 'ir')
+    WRITER_QUEUE_SIZE = 8
+    # RGB is recorded from the device's H.264 bitstream, where a dropped packet
+    # corrupts the stream until the next keyframe, so it gets ~2 s of headroom
+    BITSTREAM_QUEUE_SIZE = 60
+
+    # Recent RGB/IR frames kept for matching to a depth frame's capture time
+    SYNC_HISTORY = 4
+
+    # Depth range (mm) kept by the stereo threshold filter
+    DEPTH_MIN_MM = 400
+    DEPTH_MAX_MM = 8000
+
     def __init__(self):
         self.running = False
         self.device = None
@@ -17,13 +40,58 @@ class CameraManager:
         self.mask_coords = [0, 0, 0, 0]
         self.available_devices = []
         self.current_device_info = None
+        self._info_cache = {}  # MxId -> device info dict
         self.device_info_callback = None
-        self.video_writers = None
+
+        # Video encoding runs on one writer thread per stream so a slow encode
+        # cannot stall frame acquisition. The per-stream locks guard writer swaps.
+        self._video_writers = None
+        self._writer_locks = {name: threading.Lock() for name in self.VIDEO_STREAMS}
+        self._writer_queues = {
+            name: queue.Queue(maxsize=self.WRITER_QUEUE_SIZE) for name in self.VIDEO_STREAMS
+        }
+        self._writer_queues['rgb'] = queue.Queue(maxsize=self.BITSTREAM_QUEUE_SIZE)
+        self._writer_threads = []
+        # Frames dropped per stream because its writer queue was full
+        self.dropped_frames = dict.fromkeys(self.VIDEO_STREAMS, 0)
+
+        # Fixed-range uint16 depth -> JET BGR lookup, so display colorization
+        # is a single indexing pass
+        depth_scale = 255.0 / (self.DEPTH_MAX_MM - self.DEPTH_MIN_MM)
+        depth_lut = np.clip(
+            (np.arange(65536) - self.DEPTH_MIN_MM) * depth_scale, 0, 255
+        ).astype(np.uint8)
+        self._depth_bgr_lut = cv2.applyColorMap(
+            depth_lut.reshape(-1, 1), cv2.COLORMAP_JET
+        ).reshape(65536, 3)
+
+        # Tiled, multi-threaded contrast enhancement for the IR stream
+        self._clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
         
-        # Queues for frames. Created after pipeline/device is started
+        # Frames handed to frame_callback, reused every iteration. Streams
+        # without a new frame are None; callbacks must not keep the dict or
+        # the preview arrays, which are written into persistent buffers.
+        self._frames = dict.fromkeys(('rgb', 'depth', 'depth_raw', 'ir'))
+        self._bufs = {}  # (name, shape, dtype) -> reusable output array
+
+        # Last processed packet sequence number per stream
+        self._last_seq = {}
+        
+        # Newest full-resolution frames for saving, kept by the camera thread
+        # so capture code never competes with it for queue packets
         self.latest_rgb_video = None
-        self.q_rgb_preview = None
+        self.latest_depth_raw = None
+        self.latest_ir_raw = None
+        # Host-side sync: recent (device timestamp, frame) pairs per stream,
+        # guarded by one lock so a snapshot is taken atomically
+        self._latest_lock = threading.Lock()
+        self._rgb_history = deque(maxlen=self.SYNC_HISTORY)
+        self._ir_history = deque(maxlen=self.SYNC_HISTORY)
+        self._latest_depth_ts = None
+
+        # Queues for frames. Created after pipeline/device is started
         self.q_rgb_video = None
+        self.q_h264 = None
         self.q_depth = None
         self.q_left = None
         self.q_control = None
@@ -50,25 +118,40 @@ class CameraManager:
     def get_device_info(self, device_info: dai.DeviceInfo) -> Dict:
         """
         Get detailed information about a device.
-        Note: We briefly open the device to query info, then close.
+        Results are cached per MxId until the camera stops. Uses the running
+        device if it is the one asked about; otherwise we briefly open the
+        device to query info, then close.
         """
+        mx_id = device_info.getMxId()
+        if mx_id in self._info_cache:
+            return self._info_cache[mx_id]
         try:
-            with dai.Device(device_info) as device:
-                cameras = device.getConnectedCameras()
-                # features = device.getConnectedFeatures()
-
-                return {
-                    'name': device_info.getMxId(),
-                    'cameras': [str(cam) for cam in cameras],
-                    # 'features': [str(feature) for feature in features],
-                    'protocol': str(device_info.protocol),
-                    'state': str(device_info.state),
-                    'ip': device_info.name if device_info.protocol == dai.XLinkProtocol.X_LINK_TCP_IP else None
-                }
+            if self.device is not None and self.device.getMxId() == mx_id:
+                info = self._describe_device(self.device, device_info)
+            else:
+                with dai.Device(device_info) as device:
+                    info = self._describe_device(device, device_info)
+            self._info_cache[mx_id] = info
+            return info
         except Exception as e:
             print(f"Error getting device info: {str(e)}")
             return {}
 
+    @staticmethod
+    def _describe_device(device: dai.Device, device_info: dai.DeviceInfo) -> Dict:
+        """ Build the device info dict from an already-open device. """
+        cameras = device.getConnectedCameras()
+        # features = device.getConnectedFeatures()
+
+        return {
+            'name': device_info.getMxId(),
+            'cameras': [str(cam) for cam in cameras],
+            # 'features': [str(feature) for feature in features],
+            'protocol': str(device_info.protocol),
+            'state': str(device_info.state),
+            'ip': device_info.name if device_info.protocol == dai.XLinkProtocol.X_LINK_TCP_IP else None
+        }
+
     def create_pipeline(self) -> dai.Pipeline:
         """
         Create and configure the DepthAI pipeline to:
@@ -81,7 +164,6 @@ class CameraManager:
         # RGB camera node
         cam_rgb = pipeline.createColorCamera()
         cam_rgb.setVideoSize(1280, 720)
-        cam_rgb.setPreviewSize(640, 480)
         cam_rgb.setResolution(dai.ColorCameraProperties.SensorResolution.THE_720_P)
         cam_rgb.setInterleaved(False)
         cam_rgb.setColorOrder(dai.ColorCameraProperties.ColorOrder.BGR)
@@ -114,8 +196,8 @@ class CameraManager:
         config.postProcessing.speckleFilter.speckleRange = 12
         config.postProcessing.temporalFilter.enable = True
         config.postProcessing.decimationFilter.decimationFactor = 2
-        config.postProcessing.thresholdFilter.minRange = 400
-        config.postProcessing.thresholdFilter.maxRange = 8000
+        config.postProcessing.thresholdFilter.minRange = self.DEPTH_MIN_MM
+        config.postProcessing.thresholdFilter.maxRange = self.DEPTH_MAX_MM
         stereo.initialConfig.set(config)
         # Below is for older DepthAI versions. For newer ones, you can also do setDepthUnits, etc.
 
@@ -125,16 +207,28 @@ class CameraManager:
         mono_right.out.link(stereo.right)
 
         # # Create XLink outputs
-        # 1) Low-res preview for UI
-        xout_rgb_preview = pipeline.createXLinkOut()
-        xout_rgb_preview.setStreamName("rgb_preview")
-        cam_rgb.preview.link(xout_rgb_preview.input)
-
-        # 2) High-res video for saving
+        # High-res video for saving. The UI preview is downscaled from it on
+        # the host, so no separate preview stream crosses the PoE link.
         xout_rgb_video = pipeline.createXLinkOut()
         xout_rgb_video.setStreamName("rgb_video")
         cam_rgb.video.link(xout_rgb_video.input)
 
+        # On-device H.264 encoding of the video stream for recording, so the
+        # host only appends the bitstream to a file instead of encoding
+        video_enc = pipeline.create(dai.node.VideoEncoder)
+        video_enc.setDefaultProfilePreset(30, dai.VideoEncoderProperties.Profile.H264_MAIN)
+        # A keyframe every second: recordings start at the first one
+        # (see BitstreamWriter), and a dropped packet corrupts until the next
+        video_enc.setKeyframeFrequency(30)
+        cam_rgb.video.link(video_enc.input)
+
+        xout_h264 = pipeline.createXLinkOut()
+        xout_h264.setStreamName("h264")
+        video_enc.bitstream.link(xout_h264.input)
+
+        # Only raw 16-bit depth crosses XLink: it is needed for saving anyway,
+        # and ImageManip has no colormap while a Script node would colorize
+        # per pixel in interpreted Python. The host does it with one LUT pass.
         xout_depth = pipeline.createXLinkOut()
         xout_depth.setStreamName("depth")
         stereo.depth.link(xout_depth.input)
@@ -172,16 +266,21 @@ class CameraManager:
                     raise Exception("No PoE devices found.")
                 self.device = dai.Device(self.pipeline, available[0])
 
-            # Retrieve device info for UI or logging
-            self.current_device_info = self.get_device_info(
-                device_info if device_info else self.device.getDeviceInfo()
-            )
+            # Retrieve device info for UI or logging from the device we just
+            # opened, rather than booting it a second time to probe it
+            try:
+                opened_info = device_info if device_info else self.device.getDeviceInfo()
+                self.current_device_info = self._describe_device(self.device, opened_info)
+                self._info_cache[opened_info.getMxId()] = self.current_device_info
+            except Exception as e:
+                print(f"Error getting device info: {str(e)}")
+                self.current_device_info = {}
             if device_info_callback:
                 device_info_callback(self.current_device_info)
 
             # Get output queues
-            self.q_rgb_preview = self.device.getOutputQueue(name="rgb_preview", maxSize=4, blocking=False)
             self.q_rgb_video = self.device.getOutputQueue(name="rgb_video", maxSize=4, blocking=False)
+            self.q_h264 = self.device.getOutputQueue(name="h264", maxSize=30, blocking=False)
             self.q_depth = self.device.getOutputQueue(name="depth", maxSize=4, blocking=False)
             self.q_left = self.device.getOutputQueue(name="left", maxSize=4, blocking=False)
 
@@ -195,89 +294,196 @@ class CameraManager:
             ctrl.setAutoExposureEnable()  # Enables auto-exposure for the RGB camera
             self.q_control.send(ctrl)
 
+            # Cap OpenCV's internal thread pool at half the cores so its
+            # parallel_for_ workers leave room for the UI, GPS and save threads
+            cv2.setNumThreads(max(1, (os.cpu_count() or 1) // 2))
+
             # Mark as running and start thread
+            self._last_seq = {}
             self.running = True
             self.frame_callback = frame_callback
             self.camera_thread = threading.Thread(target=self._update_camera)
             self.camera_thread.daemon = True
             self.camera_thread.start()
 
+            self._writer_threads = []
+            for name in self.VIDEO_STREAMS:
+                writer_thread = threading.Thread(target=self._writer_loop, args=(name,))
+                writer_thread.daemon = True
+                writer_thread.start()
+                self._writer_threads.append(writer_thread)
+
             return True
         except Exception as e:
             print(f"Failed to start camera: {str(e)}")
             return False
 
+    @property
+    def video_writers(self) -> Optional[Dict]:
+        """ Video writers for the current recording, or None. """
+        return self._video_writers
+
+    @video_writers.setter
+    def video_writers(self, writers: Optional[Dict]):
+        # Waits for any in-flight write, so old writers can be released afterwards
+        for lock in self._writer_locks.values():
+            lock.acquire()
+        try:
+            self._video_writers = writers
+        finally:
+            for lock in self._writer_locks.values():
+                lock.release()
+
+    def _queue_video_frame(self, name: str, frame):
+        """ Hand a frame to the writer thread, dropping it if the writer is behind. """
+        try:
+            self._writer_queues[name].put_nowait(frame)
+        except queue.Full:
+            self.dropped_frames[name] += 1
+
+    def _writer_loop(self, name: str):
+        """ Encode (or, for H.264 packets, append) queued frames for one stream until the camera stops. """
+        frame_queue = self._writer_queues[name]
+        writer_lock = self._writer_locks[name]
+        while self.running:
+            try:
+                frame = frame_queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+
+            with writer_lock:
+                writer = self._video_writers.get(name) if self._video_writers else None
+                if writer is None:
+                    continue
+                try:
+                    writer.write(frame)
+                except Exception as e:
+                    print(f"Error writing {name} video frame: {str(e)}")
+
+    @staticmethod
+    def _pin_camera_thread():
+        """
+        Keep the calling (camera) thread off CPU 0 so frame processing does not
+        compete with the Tk main loop and interrupt handling there. OpenCV
+        workers started from this thread inherit the same CPU set.
+        Linux only, and skipped on hosts with fewer than 4 cores.
+        """
+        cpu_count = os.cpu_count() or 1
+        if not hasattr(os, 'sched_setaffinity') or cpu_count < 4:
+            return
+        try:
+            os.sched_setaffinity(0, set(range(1, cpu_count)))
+        except OSError as e:
+            print(f"Could not set camera thread affinity: {e}")
+
+    def _new_packet(self, name: str, packet):
+        """ Return the packet unless its sequence number was already processed. """
+        if packet is None:
+            return None
+        seq = packet.getSequenceNum()
+        if seq == self._last_seq.get(name):
+            return None
+        self._last_seq[name] = seq
+        return packet
+
     def _update_camera(self):
         """ Continuously read frames from the queues and pass them to the callback. """
+        self._pin_camera_thread()
         last_write_time = time.time()
         frame_interval = 1.0 / 15  # For 15 FPS
 
         while self.running:
             try:
                 current_time = time.time()
-                if current_time - last_write_time < frame_interval:
-                    time.sleep(0.001)
+                remaining = frame_interval - (current_time - last_write_time)
+                if remaining > 0:
+                    time.sleep(remaining)
                     continue
 
-                frames = {}
+                # Block until any output queue has data instead of polling;
+                # the timeout keeps the running flag responsive
+                if not self.device.getQueueEvents(
+                    self.OUTPUT_QUEUES, timeout=timedelta(milliseconds=100)
+                ):
+                    continue
 
-                if in_rgb := self.q_rgb_preview.tryGet():
-                    frame_rgb = in_rgb.getCvFrame()
-                    frame_rgb = self.apply_mask(frame_rgb)
-                    frames['rgb'] = frame_rgb
+                frames = self._frames
+                for name in frames:
+                    frames[name] = None
+                colorized_depth = None
+                frame_ir = None
 
                 # Drain the high-res RGB video stream and store the latest frame
-                if in_rgb_video := self.q_rgb_video.tryGet():
-                    self.latest_rgb_video = in_rgb_video.getCvFrame()
+                if in_rgb_video := self._new_packet('rgb', self.q_rgb_video.tryGet()):
+                    rgb_video = in_rgb_video.getCvFrame()
+                    with self._latest_lock:
+                        self.latest_rgb_video = rgb_video
+                        self._rgb_history.append((in_rgb_video.getTimestamp(), rgb_video))
+                    frames['rgb'] = self._make_preview(rgb_video)
+
+                # Always drain the encoder output; it is only kept while recording
+                h264_packets = self.q_h264.tryGetAll()
 
-                if in_depth := self.q_depth.tryGet():
+                if in_depth := self._new_packet('depth', self.q_depth.tryGet()):
                     # Depth is 16-bit data. We can colorize it for display:
                     depth_frame_16 = in_depth.getFrame()  
-                    # Normalize and colorize for preview
-                    depth_frame_8 = cv2.normalize(depth_frame_16, None, 0, 255, cv2.NORM_MINMAX)
-                    depth_frame_8 = depth_frame_8.astype(np.uint8)
-                    colorized_depth = cv2.applyColorMap(depth_frame_8, cv2.COLORMAP_JET)
-
-                    colorized_depth = self.apply_mask(colorized_depth)
-                    frames['depth'] = colorized_depth
+                    # Scale and colorize the fixed depth range in one pass;
+                    # reused for preview and recording
+                    # Frames queued for recording must stay untouched, so only
+                    # reuse the output buffer when depth is not being recorded
+                    if self.video_writers and self.video_writers.get('depth'):
+                        colorized_depth = self.colorize_depth(depth_frame_16)
+                    else:
+                        colorized_depth = self.colorize_depth(
+                            depth_frame_16,
+                            self._buffer('depth', depth_frame_16.shape + (3,), np.uint8)
+                        )
                     # Also store the raw 16-bit if you want to save it later:
                     frames['depth_raw'] = depth_frame_16
-
-                if in_left := self.q_left.tryGet():
-                    frame_ir = in_left.getCvFrame()
-                    # Normalize or equalize for better IR contrast
-                    frame_ir = cv2.normalize(frame_ir, None, 0, 255, cv2.NORM_MINMAX)
-                    frame_ir = cv2.equalizeHist(frame_ir)
-                    frame_ir = self.apply_mask(frame_ir)
-                    frames['ir'] = frame_ir
-
-                # Send frames to the UI or whomever uses them
-                if frames and self.frame_callback:
-                    self.frame_callback(frames)
-
-                if self.running and hasattr(self, 'video_writers') and self.video_writers:
+                    with self._latest_lock:
+                        self.latest_depth_raw = depth_frame_16
+                        self._latest_depth_ts = in_depth.getTimestamp()
+
+                if in_left := self._new_packet('ir', self.q_left.tryGet()):
+                    frame_ir = self._frame_view(in_left)
+                    with self._latest_lock:
+                        self.latest_ir_raw = frame_ir
+                        self._ir_history.append((in_left.getTimestamp(), frame_ir))
+                    # Equalize for better IR contrast (already spans the full 8-bit range)
+                    frame_ir = self._clahe.apply(
+                        frame_ir, self._buffer('ir', frame_ir.shape, np.uint8)
+                    )
+
+                # Queue frames for the writer threads before masking the previews
+                if self.running and self.video_writers:
                     try:
-                        if self.latest_rgb_video is not None and self.video_writers.get('rgb'):
-                            self.video_writers['rgb'].write(self.latest_rgb_video)
+                        # RGB is already H.264-encoded on the device; pass packets through
+                        if self.video_writers.get('rgb'):
+                            for packet in h264_packets:
+                                self._queue_video_frame('rgb', packet.getData())
                             
-                        if in_depth and self.video_writers.get('depth'):
-                            depth_frame_16 = in_depth.getFrame()
-                            depth_frame_8 = cv2.normalize(depth_frame_16, None, 0, 255, cv2.NORM_MINMAX).astype(np.uint8)
-                            colorized_depth = cv2.applyColorMap(depth_frame_8, cv2.COLORMAP_JET)
-                            self.video_writers['depth'].write(colorized_depth)
+                        if colorized_depth is not None and self.video_writers.get('depth'):
+                            # Read-only so apply_mask copies instead of zeroing the queued frame
+                            colorized_depth.flags.writeable = False
+                            self._queue_video_frame('depth', colorized_depth)
                             
-                        if in_left and self.video_writers.get('ir'):
-                            ir_frame = in_left.getCvFrame()
-                            ir_frame = cv2.normalize(ir_frame, None, 0, 255, cv2.NORM_MINMAX)
-                            ir_frame = cv2.equalizeHist(ir_frame)
-                            ir_bgr = cv2.cvtColor(ir_frame, cv2.COLOR_GRAY2BGR)
-                            self.video_writers['ir'].write(ir_bgr)
+                        if frame_ir is not None and self.video_writers.get('ir'):
+                            ir_bgr = cv2.cvtColor(frame_ir, cv2.COLOR_GRAY2BGR)
+                            self._queue_video_frame('ir', ir_bgr)
                         
-                        last_write_time = current_time  # Update timestamp after successful write
+                        last_write_time = current_time  # Update timestamp after queueing
                     except Exception as e:
-                        print(f"Error writing video frames: {str(e)}")
+                        print(f"Error queueing video frames: {str(e)}")
 
-                time.sleep(0.001)  # Small sleep to prevent CPU overload
+                if colorized_depth is not None:
+                    frames['depth'] = colorized_depth
+                if frame_ir is not None:
+                    frames['ir'] = frame_ir
+                self._mask_frames(frames)
+
+                # Send frames to the UI or whomever uses them
+                if self.frame_callback and any(frame is not None for frame in frames.values()):
+                    self.frame_callback(frames)
 
             except Exception as e:
                 print(f"Error in camera update: {str(e)}")
@@ -287,8 +493,15 @@ class CameraManager:
     def stop_camera(self):
         """ Stop camera and clean up resources. """
         self.running = False
+        self._info_cache.clear()
         if self.camera_thread:
             self.camera_thread.join(timeout=1.0)
+        for writer_thread in self._writer_threads:
+            writer_thread.join(timeout=1.0)
+        self._writer_threads = []
+        for frame_queue in self._writer_queues.values():
+            while not frame_queue.empty():
+                frame_queue.get_nowait()
 
         if self.video_writers:
             for writer in self.video_writers.values():
@@ -308,24 +521,123 @@ class CameraManager:
         """ Update mask coordinates used to black out a region of the frame. """
         self.mask_coords = coords
 
-    def apply_mask(self, frame: np.ndarray) -> np.ndarray:
+    def _mask_frames(self, frames: Dict[str, np.ndarray]):
+        """ Mask all preview frames of one iteration; the mask is read and clamped once. """
+        region = self._mask_region(self.mask_coords)
+        if region is None:
+            return
+
+        for name in ('rgb', 'depth', 'ir'):
+            if frames.get(name) is not None:
+                frames[name] = self._zero_region(frames[name], region)
+
+    def apply_mask(self, frame: np.ndarray, coords: Optional[Tuple[int, int, int, int]] = None) -> np.ndarray:
         """ Apply a rectangular mask to the frame if needed. """
         if frame is None:
             return None
 
-        # (x1, y1, x2, y2)
-        x1, y1, x2, y2 = self.mask_coords
+        region = self._mask_region(self.mask_coords if coords is None else coords)
+        if region is None:
+            return frame
+        return self._zero_region(frame, region)
+
+    @staticmethod
+    def _mask_region(coords: Tuple[int, int, int, int]) -> Optional[Tuple[slice, slice]]:
+        """
+        (rows, cols) slices a mask (x1, y1, x2, y2) zeroes, inclusive of
+        (x2, y2), or None if it covers nothing. Slicing clips the far ends to
+        each frame's size.
+        """
+        x1, y1, x2, y2 = coords
         if x2 <= x1 or y2 <= y1:
-            # No valid mask area, just return original
+            # No valid mask area
+            return None
+
+        # Negative ends must clamp too, or slicing would count them from the far edge
+        x1, y1 = max(0, x1), max(0, y1)
+        x2, y2 = max(0, x2 + 1), max(0, y2 + 1)
+        if x2 <= x1 or y2 <= y1:
+            # Mask lies entirely before the frame origin
+            return None
+        return slice(y1, y2), slice(x1, x2)
+
+    @staticmethod
+    def _zero_region(frame: np.ndarray, region: Tuple[slice, slice]) -> np.ndarray:
+        """ Zero a mask region of a frame, in place when the frame is ours to change. """
+        if frame[region].size == 0:
+            # Mask lies beyond this frame
             return frame
 
-        mask = np.ones(frame.shape[:2], dtype=np.uint8) * 255
-        cv2.rectangle(mask, (x1, y1), (x2, y2), 0, -1)
+        # Zero the region in place rather than AND-ing a full-frame mask
+        out = frame if frame.flags.owndata and frame.flags.writeable else frame.copy()
+        out[region] = 0
+        return out
 
-        if len(frame.shape) == 3:  # If color
-            mask = cv2.cvtColor(mask, cv2.COLOR_GRAY2BGR)
+    def colorize_depth(self, depth_frame: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Map a 16-bit depth frame (mm) to JET BGR over the fixed
+        DEPTH_MIN_MM..DEPTH_MAX_MM range with a single lookup-table gather.
+        Writes into out if given, otherwise returns a new array.
+        """
+        if out is None:
+            return self._depth_bgr_lut[depth_frame]
+        # mode='clip' lets take write straight into out ('raise' gathers into a
+        # temporary first); uint16 indices cannot exceed the 65536-row table
+        return np.take(self._depth_bgr_lut, depth_frame, axis=0, out=out, mode='clip')
+
+    @staticmethod
+    def _frame_view(packet: dai.ImgFrame) -> np.ndarray:
+        """
+        View an 8-bit mono packet as an image without the copy getCvFrame()
+        makes. NV12 video frames still need getCvFrame().
+        """
+        shape = (packet.getHeight(), packet.getWidth())
+        return np.frombuffer(packet.getData(), dtype=np.uint8).reshape(shape)
+
+    def _buffer(self, name: str, shape: Tuple[int, ...], dtype) -> np.ndarray:
+        """ Return a persistent output array for a stream, allocated on first use of a shape. """
+        key = (name, shape, dtype)
+        buf = self._bufs.get(key)
+        if buf is None:
+            buf = self._bufs[key] = np.empty(shape, dtype=dtype)
+        return buf
+
+    def _make_preview(self, frame: np.ndarray) -> np.ndarray:
+        """ Center-crop a video frame to the preview aspect ratio and downscale it. """
+        height, width = frame.shape[:2]
+        preview_w, preview_h = self.PREVIEW_SIZE
+        crop_w = min(width, height * preview_w // preview_h)
+        x0 = (width - crop_w) // 2
+        dst = self._buffer('rgb', (preview_h, preview_w) + frame.shape[2:], frame.dtype)
+        return cv2.resize(frame[:, x0:x0 + crop_w], self.PREVIEW_SIZE, dst=dst, interpolation=cv2.INTER_AREA)
+
+    @staticmethod
+    def _nearest_frame(history: deque, timestamp) -> Optional[np.ndarray]:
+        """ Frame from a (timestamp, frame) history captured closest to timestamp. """
+        if not history:
+            return None
+        return min(history, key=lambda entry: abs(entry[0] - timestamp))[1]
 
-        return cv2.bitwise_and(frame, mask)
+    def get_latest_frames(self) -> Dict[str, Optional[np.ndarray]]:
+        """
+        Atomic snapshot of full-resolution frames: 'rgb' (BGR video),
+        'depth_raw' (16-bit depth) and 'ir' (unprocessed mono). RGB and IR are
+        the recent frames captured closest to the newest depth frame, so the
+        three show the same instant. Entries are None until the stream has
+        delivered a frame.
+        """
+        with self._latest_lock:
+            if self._latest_depth_ts is None:
+                return {
+                    'rgb': self.latest_rgb_video,
+                    'depth_raw': None,
+                    'ir': self.latest_ir_raw
+                }
+            return {
+                'rgb': self._nearest_frame(self._rgb_history, self._latest_depth_ts),
+                'depth_raw': self.latest_depth_raw,
+                'ir': self._nearest_frame(self._ir_history, self._latest_depth_ts)
+            }
 
     def get_current_device_info(self) -> Optional[Dict]:
         """ Return last device info if needed. """
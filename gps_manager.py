@@ -1,45 +1,185 @@
 import serial
-import pynmea2
-import glob
 import os
+import select
 import threading
 import time
+from functools import reduce
+from operator import xor
 from typing import Optional, Callable
 import json
 from math import radians, sin, cos, sqrt, atan2 
+import numpy as np
+
+# Mean earth radius in meters
+EARTH_RADIUS_M = 6371000.0
+
+
+def _haversine_m(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Haversine distance in meters between two points given in radians"""
+    dlat = lat2 - lat1
+    dlon = lon2 - lon1
+    a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlon/2)**2
+    return 2 * EARTH_RADIUS_M * atan2(sqrt(a), sqrt(1-a))
+
+
+def _dm_to_deg(value: str, direction: str) -> float:
+    """Convert an NMEA (d)ddmm.mmmm field to signed decimal degrees"""
+    if not value:
+        return 0.0
+    point = value.find('.')
+    split = (point if point >= 0 else len(value)) - 2
+    degrees = float(value[:split]) + float(value[split:]) / 60
+    return -degrees if direction in ('S', 'W') else degrees
+
+
+# Two-character hex checksum -> value, so validation needs no int() parsing
+_HEX_BYTES = {}
+for _value in range(256):
+    _HEX_BYTES[b'%02X' % _value] = _value
+    _HEX_BYTES[b'%02x' % _value] = _value
+
+
+def _nmea_checksum_ok(line: bytes) -> bool:
+    """
+    Check an NMEA sentence's XOR checksum without raising.
+    Sentences without a checksum are accepted.
+    """
+    star = line.rfind(b'*')
+    if star < 0:
+        return True
+    expected = _HEX_BYTES.get(line[star + 1:star + 3])
+    if expected is None or star < 1:
+        return False
+
+    # XOR of every byte between '$' and '*'
+    return reduce(xor, line[1:star], 0) == expected
+
+
+def _rmc_timestamp(time_str: str, date_str: str) -> Optional[str]:
+    """
+    Receiver UTC time as "YYYY-MM-DD hh:mm:ss", or None until the receiver
+    reports a complete date and time (the date field is often empty before
+    its first fix). Two-digit years from 80 on are 19xx, matching the GPS
+    epoch (1980), so rolled-over receivers do not land in the 2080s/90s.
+    """
+    if len(date_str) != 6 or len(time_str) < 6 or not (date_str + time_str[:6]).isdigit():
+        return None
+    century = '19' if date_str[4:6] >= '80' else '20'
+    return (f"{century}{date_str[4:6]}-{date_str[2:4]}-{date_str[0:2]} "
+            f"{time_str[0:2]}:{time_str[2:4]}:{time_str[4:6]}")
+
+
+def _parse_rmc(line: str) -> Optional[dict]:
+    """
+    Parse a checksum-validated RMC sentence into a coordinates dict with plain
+    string splitting. Returns None if the sentence carries no position.
+    Raises ValueError on malformed fields.
+    """
+    body = line.strip().partition('*')[0]
+
+    # $xxRMC,hhmmss.ss,status,lat,N/S,lon,E/W,speed,course,ddmmyy,...
+    fields = body.split(',')
+    if len(fields) < 10:
+        raise ValueError("Truncated RMC sentence")
+
+    latitude = _dm_to_deg(fields[3], fields[4])
+    longitude = _dm_to_deg(fields[5], fields[6])
+    if not latitude or not longitude:
+        return None
+
+    return {
+        'timestamp': _rmc_timestamp(fields[1], fields[9]),
+        'latitude': latitude,
+        'lat_dir': fields[4],
+        'longitude': longitude,
+        'lon_dir': fields[6],
+        'speed': float(fields[7]) if fields[7] else None,
+        # Host receive time as an int; format it only where a string is needed
+        'ts_ns': time.time_ns()
+    }
+
+
+# Sentence prefix -> parser returning a coordinates dict (or None).
+# Other sentence types can be added here without touching the read loop.
+_SENTENCE_PARSERS = {
+    b'$GPRMC': _parse_rmc,
+    b'$GNRMC': _parse_rmc,
+}
+
 
 class GPSManager:
+    # Fixes kept in the track ring buffer (~2.7 h at 1 Hz)
+    TRACK_SIZE = 10000
+    TRACK_DTYPE = np.dtype([
+        ('ts', 'i8'),  # host receive time, ns since the epoch
+        ('lat', 'f8'),
+        ('lon', 'f8'),
+        ('spd', 'f4'),
+        ('lat_dir', 'S1'),
+        ('lon_dir', 'S1')
+    ])
+
+    # Longest partial line kept while waiting for a newline; NMEA sentences
+    # are at most 82 bytes
+    MAX_LINE_BYTES = 1024
+
+    # Fixes buffered before each append to the binary track log
+    LOG_BATCH = 64
+
+    # Serial device names a USB GPS receiver shows up as, most likely first
+    PORT_PREFIXES = ('ttyUSB', 'ttyACM', 'tty.usbserial')
+
     def __init__(self):
         self.running = False
+        # Latest fix. Each fix is a new dict published with one reference
+        # assignment and never modified afterwards, so readers on other
+        # threads always see a complete fix without locking.
         self.current_coords = None
         self.gps_thread = None
         self.serial_connection = None
         self._callback = None
         self.last_position = None
+        self._port = None  # last port the receiver was found on
+        # Self-pipe that stop_gps writes to, waking the reader out of select()
+        self._wake_r = None
+        self._wake_w = None
+
+        # Track history as one preallocated structured array used as a ring buffer
+        self._track = np.zeros(self.TRACK_SIZE, dtype=self.TRACK_DTYPE)
+        self._track_count = 0  # total fixes recorded; next slot is count % size
+
+        # Optional binary track log: raw TRACK_DTYPE records appended in batches
+        self._log_file = None
+        self._log_buf = bytearray()
         
     def calculate_distance(self, coord1, coord2):
         """
         Calculate distance between two GPS coordinates using the Haversine formula
         Returns distance in meters
         """
-        # Earth's radius in meters
-        R = 6371000
-        
         # Convert latitude and longitude to radians
-        lat1 = radians(float(coord1['latitude']))
-        lon1 = radians(float(coord1['longitude']))
-        lat2 = radians(float(coord2['latitude']))
-        lon2 = radians(float(coord2['longitude']))
-        
-        # Haversine formula
-        dlat = lat2 - lat1
-        dlon = lon2 - lon1
-        a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlon/2)**2
-        c = 2 * atan2(sqrt(a), sqrt(1-a))
-        distance = R * c
-        
-        return distance
+        return _haversine_m(
+            radians(float(coord1['latitude'])),
+            radians(float(coord1['longitude'])),
+            radians(float(coord2['latitude'])),
+            radians(float(coord2['longitude']))
+        )
         
+    def calculate_distances_bulk(self, coords: np.ndarray) -> np.ndarray:
+        """
+        Vectorized Haversine over a track of fixes
+        :param coords: array of shape (N, 2) holding latitude, longitude in degrees
+        Returns an (N-1,) array of distances in meters between consecutive fixes
+        """
+        coords = np.asarray(coords, dtype=np.float64)
+        lat = np.radians(coords[:, 0])
+        lon = np.radians(coords[:, 1])
+
+        dlat = np.diff(lat)
+        dlon = np.diff(lon)
+        a = np.sin(dlat / 2) ** 2 + np.cos(lat[:-1]) * np.cos(lat[1:]) * np.sin(dlon / 2) ** 2
+        return 2 * EARTH_RADIUS_M * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
     def get_distance_moved(self):
         """
         Calculate distance moved from last position
@@ -54,21 +194,41 @@ class GPSManager:
         return distance, current
 
     def find_gps_port(self) -> Optional[str]:
-        """Find the USB port for the GPS receiver"""
-        patterns = [
-            '/dev/ttyUSB*',
-            '/dev/ttyACM*',
-            '/dev/tty.usbserial*'
-        ]
-        
-        for pattern in patterns:
-            ports = glob.glob(pattern)
+        """
+        Find the USB port for the GPS receiver.
+        The last port found is reused while its device node still exists, so
+        the /dev scan only runs on first use or after the receiver is unplugged.
+        """
+        if self._port and os.path.exists(self._port):
+            return self._port
+
+        # One pass over /dev instead of a glob per pattern; prefixes are
+        # listed in order of preference
+        matches = {prefix: [] for prefix in self.PORT_PREFIXES}
+        try:
+            with os.scandir('/dev') as entries:
+                for entry in entries:
+                    if entry.name.startswith(self.PORT_PREFIXES):
+                        for prefix in self.PORT_PREFIXES:
+                            if entry.name.startswith(prefix):
+                                matches[prefix].append(entry.path)
+                                break
+        except OSError:
+            pass
+
+        for ports in matches.values():
             if ports:
-                return ports[0]
+                self._port = min(ports)
+                return self._port
+        self._port = None
         return None
         
-    def start_gps(self, callback: Optional[Callable] = None) -> bool:
-        """Start GPS reading in a separate thread"""
+    def start_gps(self, callback: Optional[Callable] = None, log_path: Optional[str] = None) -> bool:
+        """
+        Start GPS reading in a separate thread.
+        If log_path is given, every fix is also appended there as a binary
+        record; read it back with np.fromfile(log_path, GPSManager.TRACK_DTYPE).
+        """
         if self.running:
             return False
             
@@ -82,41 +242,132 @@ class GPSManager:
                 baudrate=4800,
                 timeout=1
             )
-            
+        except serial.SerialException as e:
+            raise Exception(f"Failed to connect to GPS: {str(e)}")
+
+        try:
+            # Ask the tty driver (e.g. FTDI) to deliver bytes immediately
+            # instead of batching them on its latency timer
+            try:
+                self.serial_connection.set_low_latency_mode(True)
+            except (AttributeError, ValueError, OSError) as e:
+                print(f"GPS low-latency mode not available: {str(e)}")
+
+            self._wake_r, self._wake_w = os.pipe()
+            if log_path:
+                self._log_file = open(log_path, 'ab')
             self.running = True
             self._callback = callback
             self.gps_thread = threading.Thread(target=self._read_gps)
             self.gps_thread.daemon = True
             self.gps_thread.start()
             return True
-            
-        except serial.SerialException as e:
-            raise Exception(f"Failed to connect to GPS: {str(e)}")
+
+        except Exception as e:
+            # e.g. an unwritable log directory or no free fds: release what was
+            # opened so a retry starts clean
+            self.running = False
+            self._close_resources()
+            raise Exception(f"Failed to start GPS: {str(e)}")
             
     def _read_gps(self):
-        """GPS reading loop"""
+        """
+        GPS reading loop. Waits on the serial fd with select and frames
+        sentences on newlines from whatever bytes have arrived. stop_gps
+        wakes the select through the self-pipe, so shutdown is immediate.
+        """
+        fd = self.serial_connection.fileno()
+        wake_fd = self._wake_r
+        buffer = bytearray()
         while self.running:
             try:
-                line = self.serial_connection.readline().decode('ascii', errors='replace')
-                
-                if line.startswith('$GPRMC') or line.startswith('$GNRMC'):
-                    msg = pynmea2.parse(line)
-                    if msg.latitude and msg.longitude:
-                        self.current_coords = {
-                            'timestamp': msg.timestamp.strftime('%Y-%m-%d %H:%M:%S'),
-                            'latitude': msg.latitude,
-                            'lat_dir': msg.lat_dir,
-                            'longitude': msg.longitude,
-                            'lon_dir': msg.lon_dir,
-                            'speed': msg.spd_over_grnd
-                        }
-                        
-                        if self._callback:
-                            self._callback(self.current_coords)
-                            
-            except (pynmea2.ParseError, UnicodeDecodeError):
-                continue
+                ready, _, _ = select.select([fd, wake_fd], [], [])
+                if wake_fd in ready or not self.running:
+                    break
+                data = os.read(fd, 4096)
+            except OSError as e:
+                if self.running:
+                    print(f"GPS read error: {str(e)}")
+                break
+            if not data:
+                # EOF: the receiver was unplugged or the tty hung up. select
+                # would keep reporting the fd readable, so stop reading.
+                print("GPS device disconnected")
+                break
+            buffer += data
+
+            while (newline := buffer.find(b'\n')) >= 0:
+                line = bytes(buffer[:newline]).rstrip()
+                del buffer[:newline + 1]
+                self._handle_line(line)
+            # A stream without newlines (wrong baud rate, line noise) is not NMEA
+            if len(buffer) > self.MAX_LINE_BYTES:
+                buffer.clear()
+
+    def _handle_line(self, line: bytes):
+        """Parse one NMEA sentence and publish it if it is a position fix"""
+        # Reject other sentences and corrupted lines before any decoding,
+        # so noisy links do not cost an exception per line
+        parser = _SENTENCE_PARSERS.get(line[:6])
+        if parser is None or not _nmea_checksum_ok(line):
+            return
+
+        try:
+            coords = parser(line.decode('ascii', errors='replace'))
+        except ValueError:
+            return
+
+        if coords:
+            self._record_fix(coords)
+            # Publish only once the fix is complete; it must not be mutated after
+            self.current_coords = coords
+            
+            if self._callback:
+                self._callback(self.current_coords)
                 
+    def _record_fix(self, coords: dict):
+        """Store a fix in the track ring buffer, overwriting the oldest when full"""
+        row = self._track[self._track_count % self.TRACK_SIZE]
+        row['ts'] = coords['ts_ns']
+        row['lat'] = coords['latitude']
+        row['lon'] = coords['longitude']
+        row['spd'] = coords['speed'] if coords['speed'] is not None else np.nan
+        row['lat_dir'] = coords['lat_dir'].encode()
+        row['lon_dir'] = coords['lon_dir'].encode()
+
+        if self._log_file is not None:
+            slot = self._track_count % self.TRACK_SIZE
+            self._log_buf += self._track[slot:slot + 1].tobytes()
+            if len(self._log_buf) >= self.LOG_BATCH * self.TRACK_DTYPE.itemsize:
+                self._flush_log()
+        self._track_count += 1
+
+    def _flush_log(self):
+        """Append buffered track records to the log file in one write"""
+        try:
+            self._log_file.write(self._log_buf)
+            self._log_file.flush()
+        except OSError as e:
+            print(f"GPS log write error: {str(e)}")
+        self._log_buf.clear()
+
+    def get_track(self) -> np.ndarray:
+        """Copy of the recorded fixes in chronological order (structured array)"""
+        count = self._track_count
+        if count <= self.TRACK_SIZE:
+            return self._track[:count].copy()
+        head = count % self.TRACK_SIZE
+        return np.concatenate((self._track[head:], self._track[:head]))
+
+    def get_track_distance(self) -> float:
+        """Total distance in meters along the recorded track"""
+        track = self.get_track()
+        if len(track) < 2:
+            return 0.0
+        return float(self.calculate_distances_bulk(
+            np.column_stack((track['lat'], track['lon']))
+        ).sum())
+
     def get_current_location(self) -> Optional[dict]:
         """Get the most recent GPS coordinates"""
         return self.current_coords
@@ -124,16 +375,40 @@ class GPSManager:
     def stop_gps(self):
         """Stop GPS reading"""
         self.running = False
-        if self.serial_connection:
-            self.serial_connection.close()
+        # Wake the reader and let it leave select() before its fds are closed
+        if self._wake_w is not None:
+            os.write(self._wake_w, b'\0')
         if self.gps_thread:
             self.gps_thread.join(timeout=1.0)
+        self._close_resources()
+
+    def _close_resources(self):
+        """Close the serial port, the track log and the wake pipe"""
+        if self.serial_connection:
+            self.serial_connection.close()
+        if self._log_file is not None:
+            self._flush_log()
+            self._log_file.close()
+            self._log_file = None
+        if self._wake_w is not None:
+            os.close(self._wake_r)
+            os.close(self._wake_w)
+            self._wake_r = self._wake_w = None
             
     def save_coords_to_json(self, filepath: str):
-        """Save current coordinates to a JSON file"""
-        if self.current_coords:
-            with open(filepath, 'w') as f:
-                json.dump(self.current_coords, f, indent=4)
+        """
+        Save current coordinates to a JSON file.
+        Compact output keeps json on its C encoder (indent forces the pure-Python
+        one). The document is written to a temporary file with a single call and
+        then renamed over filepath, so readers never see a partial file.
+        """
+        coords = self.current_coords  # one read; fixes are replaced, never mutated
+        if coords:
+            data = json.dumps(coords, separators=(',', ':')).encode()
+            tmp_path = filepath + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, filepath)
                 
     def __del__(self):
         self.stop_gps()
\ No newline at end of file
@@ -1,15 +1,16 @@
+import gc
 import tkinter as tk
-from datetime import datetime
 import time
 import threading
 from typing import Dict, Any
 from ui_manager import UIManager
 from camera_manager import CameraManager
-from gps_manager import GPSManager
+from gps_manager import GPSManager, EARTH_RADIUS_M
 from storage_manager import StorageManager
 import cv2
 import numpy as np
 import os
+from math import radians, cos
 
 class MainApplication:
     def __init__(self):
@@ -36,14 +37,22 @@ class MainApplication:
             self.ui.set_gps_enabled(False)
 
         self.storage = StorageManager()
-        self.last_gps_coords = None
-        self.gps_threshold = 0.0001  # ~11 meters threshold
+        # Last position motion was measured from, as (lat_rad, lon_rad, cos(lat))
+        self._last_pos_rad = None
+        self.gps_threshold_m = 11.0  # movement needed to count as moving
+        # Squared threshold as an angle, for the equirectangular motion test
+        self._thresh_sq_rad = (self.gps_threshold_m / EARTH_RADIUS_M) ** 2
         self.is_moving = False
 
+        # CLAHE used to enhance saved IR frames. Shared by the save loop and
+        # manual capture (Tk thread); a CLAHE object is not thread-safe, so
+        # it is only applied under _clahe_lock.
+        self._ir_clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
+        self._clahe_lock = threading.Lock()
+
         # Initialize video path
         video_path = os.path.join(self.storage.get_base_path(), 'videos')
-        if not os.path.exists(video_path):
-            os.makedirs(video_path)
+        os.makedirs(video_path, exist_ok=True)
         self.ui.video_dir_var.set(video_path)
 
         # Set up UI callbacks
@@ -59,17 +68,26 @@ class MainApplication:
         )
 
         self.running = False
-        self.last_save_time = 0
+        self.last_save_time = 0  # time.monotonic() of the last interval capture
         self.save_thread = None
+        # Wakes the save loop early: on stop, and on each GPS fix
+        self._wake = threading.Event()
         self.selected_device = None
 
-        # Bind manual capture key
-        self.root.bind('c', self.manual_capture)
-        self.root.bind('C', self.manual_capture)
+        # Manual capture from the 'C' key and the Manual Capture button
+        self.ui.set_manual_capture_callback(self.manual_capture)
 
         # Initial device refresh
         self.refresh_devices()
 
+        # Periodically show storage writer statistics
+        self._refresh_storage_stats()
+
+    def _refresh_storage_stats(self):
+        """Show storage writer statistics, then reschedule on the Tk loop."""
+        self.ui.update_storage_stats(self.storage.get_stats())
+        self.root.after(1000, self._refresh_storage_stats)
+
     def toggle_gps(self, enabled: bool):
         """ Handle GPS toggle """
         if enabled:
@@ -77,7 +95,7 @@ class MainApplication:
                 self.gps = GPSManager()
                 if self.running:
                     try:
-                        self.gps.start_gps(callback=self.ui.update_gps_status)
+                        self.gps.start_gps(callback=self._on_gps_fix, log_path=self._gps_log_path())
                     except Exception as e:
                         self.ui.show_error("GPS Error", f"Failed to start GPS: {str(e)}")
                         self.gps = None
@@ -88,6 +106,10 @@ class MainApplication:
                 self.gps = None
                 self.ui.update_gps_status(None)
 
+    def _gps_log_path(self) -> str:
+        """Binary track log for a GPS session, next to the day's captures"""
+        return os.path.join(self.storage.current_path, f"gps_{time.strftime('%H%M%S')}.bin")
+
     def refresh_devices(self):
         """Refresh available devices list (PoE only)."""
         devices = self.camera.find_devices()
@@ -111,7 +133,7 @@ class MainApplication:
             # Start GPS if enabled
             if self.gps is not None:
                 try:
-                    self.gps.start_gps(callback=self.ui.update_gps_status)
+                    self.gps.start_gps(callback=self._on_gps_fix, log_path=self._gps_log_path())
                 except Exception as e:
                     self.ui.show_error("GPS Error", f"Failed to start GPS: {str(e)}")
                     self.gps = None
@@ -125,7 +147,8 @@ class MainApplication:
             )
 
             self.running = True
-            self.last_save_time = time.time()
+            self.last_save_time = time.monotonic()
+            self._wake.clear()
 
             # Start the background thread that periodically saves frames
             self.save_thread = threading.Thread(target=self._save_loop)
@@ -143,8 +166,11 @@ class MainApplication:
             self.toggle_recording(self.recording_state['type'], False)
             
         self.running = False
+        self._wake.set()
         if self.save_thread:
             self.save_thread.join(timeout=1.0)
+        # Finish writing captures that are still queued
+        self.storage.flush()
 
         self.camera.stop_camera()
         self.ui.control_btn.config(text="Start Camera")  # Update button text
@@ -161,8 +187,7 @@ class MainApplication:
         self.storage.set_base_path(path)
         # Update video path as well
         video_path = os.path.join(path, 'videos')
-        if not os.path.exists(video_path):
-            os.makedirs(video_path)
+        os.makedirs(video_path, exist_ok=True)
         self.storage.set_video_path(video_path)
         self.ui.video_dir_var.set(video_path)
 
@@ -171,26 +196,7 @@ class MainApplication:
         """Handle manual capture when 'C' key is pressed."""
         if self.running:
             try:
-                # Get current frames from camera queues
-                # Use blocking get() to retrieve the most recent frames
-                frames = {}
-                if self.camera.latest_rgb_video is not None: 
-                    frames['rgb'] = self.camera.latest_rgb_video 
-                else: 
-                    print("Warning: No high-res RGB frame available for capture.")
-
-                if self.camera.q_depth:
-                    depth_data = self.camera.q_depth.get()
-                    depth_raw = depth_data.getFrame()  # 16-bit
-                    depth_8 = cv2.normalize(depth_raw, None, 0, 255, cv2.NORM_MINMAX).astype(np.uint8)
-                    frames['depth'] = cv2.applyColorMap(depth_8, cv2.COLORMAP_JET)
-                    # Save raw as well if needed
-                    frames['depth_raw'] = depth_raw
-                if self.camera.q_left:
-                    ir_data = self.camera.q_left.get().getCvFrame()
-                    ir_data = cv2.normalize(ir_data, None, 0, 255, cv2.NORM_MINMAX)
-                    ir_data = cv2.equalizeHist(ir_data)
-                    frames['ir'] = ir_data
+                frames = self._snapshot_frames()
 
                 # Get GPS coordinates if available
                 coords = None
@@ -198,7 +204,7 @@ class MainApplication:
                     coords = self.gps.get_current_location()
 
                 # Save frames
-                timestamp = datetime.now()
+                timestamp = time.time()
                 self.storage.save_frames_with_metadata(
                     frames=frames,
                     metadata=coords if coords else {"gps": "disabled"},
@@ -212,35 +218,85 @@ class MainApplication:
             except Exception as e:
                 print(f"Error in manual capture: {str(e)}")
 
-    def check_motion(self, current_coords):
-        """Check if the vehicle is moving based on GPS coordinates."""
-        if not self.last_gps_coords or not current_coords:
-            self.last_gps_coords = current_coords
-            return True  # Assume moving if no previous coords
+    def _snapshot_frames(self) -> Dict[str, np.ndarray]:
+        """
+        Build the frames to save from the camera thread's latest frames,
+        without waiting on any device queue. Streams with no frame yet are
+        left out.
+        """
+        latest = self.camera.get_latest_frames()
+        frames = {}
+
+        if latest['rgb'] is not None:
+            frames['rgb'] = latest['rgb']
+        else:
+            print("Warning: No high-res RGB frame available for capture.")
 
         try:
-            lat_diff = abs(float(current_coords['latitude']) - float(self.last_gps_coords['latitude']))
-            lon_diff = abs(float(current_coords['longitude']) - float(self.last_gps_coords['longitude']))
+            if latest['depth_raw'] is not None:
+                depth_raw = latest['depth_raw']  # 16-bit
+                # Same fixed-range colormap as the preview and depth video
+                frames['depth'] = self.camera.colorize_depth(depth_raw)
+                # Save raw as well if needed
+                frames['depth_raw'] = depth_raw
+        except Exception as e:
+            print(f"Error capturing depth frame: {str(e)}")
+
+        try:
+            if latest['ir'] is not None:
+                frames['ir'] = self._enhance_ir(latest['ir'])
+        except Exception as e:
+            print(f"Error capturing IR frame: {str(e)}")
 
-            is_moving = lat_diff > self.gps_threshold or lon_diff > self.gps_threshold
+        return frames
 
-            if is_moving:
-                self.last_gps_coords = current_coords
+    def _enhance_ir(self, ir_frame: np.ndarray) -> np.ndarray:
+        """
+        Local contrast enhancement for a saved IR frame with the cached CLAHE
+        object (instead of global equalizeHist). Returns a new array, since the
+        storage writer thread holds earlier ones.
+        """
+        with self._clahe_lock:
+            return self._ir_clahe.apply(ir_frame)
 
-            self.ui.update_motion_status(is_moving)
-            return is_moving
+    def check_motion(self, current_coords):
+        """Check if the vehicle is moving based on GPS coordinates."""
+        if not current_coords:
+            self._last_pos_rad = None
+            return True  # Assume moving if no coords
 
+        try:
+            lat2 = radians(float(current_coords['latitude']))
+            lon2 = radians(float(current_coords['longitude']))
         except (KeyError, ValueError) as e:
             print(f"Error checking motion: {str(e)}")
             return True  # default to True if error
 
+        if self._last_pos_rad is None:
+            self._last_pos_rad = (lat2, lon2, cos(lat2))
+            return True  # Assume moving if no previous coords
+
+        # Equirectangular approximation: accurate for the few-meter deltas
+        # tested here and, unlike raw degree differences, isotropic
+        lat1, lon1, cos_lat1 = self._last_pos_rad
+        dx = (lon2 - lon1) * cos_lat1
+        dy = lat2 - lat1
+        is_moving = dx * dx + dy * dy > self._thresh_sq_rad
+
+        if is_moving:
+            self._last_pos_rad = (lat2, lon2, cos(lat2))
+
+        # Runs on the save thread; Tk updates go through the UI thread
+        self.ui.post(self.ui.update_motion_status, is_moving)
+        return is_moving
+
     def _save_loop(self):
         """
         Background thread that saves frames at either time intervals or distance intervals.
         """
         while self.running:
             try:
-                current_time = time.time()
+                current_time = time.monotonic()
                 should_capture = False
                 coords = None
 
@@ -259,64 +315,53 @@ class MainApplication:
 
                 # Check motion status if we have GPS coordinates
                 if coords and not self.check_motion(coords):
-                    time.sleep(0.1)
+                    self._wait_for_next_check()
                     continue
 
                 if should_capture:
-                    frames = {}
                     save_success = False
+                    frames = self._snapshot_frames()
 
-                    # Try to get each frame type
-                    try:
-                        if self.camera.latest_rgb_video is not None: 
-                            frames['rgb'] = self.camera.latest_rgb_video 
-                        else: 
-                            print("Warning: No high-res RGB frame available for capture.")
-                    except Exception as e:
-                        print(f"Error capturing RGB frame: {str(e)}")
-
-                    try:
-                        if self.camera.q_depth:
-                            depth_data = self.camera.q_depth.get()
-                            depth_raw = depth_data.getFrame()  # 16-bit
-                            depth_8 = cv2.normalize(depth_raw, None, 0, 255, cv2.NORM_MINMAX).astype(np.uint8)
-                            frames['depth'] = cv2.applyColorMap(depth_8, cv2.COLORMAP_JET)
-                            # Save raw as well if needed
-                            frames['depth_raw'] = depth_raw
-                    except Exception as e:
-                        print(f"Error capturing depth frame: {str(e)}")
-
-                    try:
-                        if self.camera.q_left:
-                            ir_data = self.camera.q_left.get().getCvFrame()
-                            ir_data = cv2.normalize(ir_data, None, 0, 255, cv2.NORM_MINMAX)
-                            ir_data = cv2.equalizeHist(ir_data)
-                            frames['ir'] = ir_data
-                    except Exception as e:
-                        print(f"Error capturing IR frame: {str(e)}")
-
-                    # Only save if we have at least one frame
+                    # Only save if we have at least one frame; the storage
+                    # writer thread does the encoding and file I/O
                     if frames:
                         try:
-                            saved_files = self.storage.save_frames_with_metadata(
+                            self.storage.save_frames_with_metadata(
                                 frames=frames,
                                 metadata=coords if coords else {"gps": "disabled"},
-                                timestamp=datetime.now(),
+                                timestamp=time.time(),
                                 capture_type="auto"
                             )
                             save_success = True
-                            print(f"Saved frames: {', '.join([os.path.basename(f) for f in saved_files])}")
                         except Exception as e:
                             print(f"Error saving frames: {str(e)}")
 
                     if save_success:
                         self.last_save_time = current_time
 
-                time.sleep(0.1)
-
             except Exception as e:
                 print(f"Error in save loop: {str(e)}")
-                time.sleep(0.1)
+
+            self._wait_for_next_check()
+
+    def _on_gps_fix(self, coords):
+        """GPS thread callback: update the UI and let the save loop re-check on new data."""
+        self.ui.post(self.ui.update_gps_status, coords)
+        self._wake.set()
+
+    def _wait_for_next_check(self):
+        """
+        Sleep the save loop until its next time-based deadline, or until a GPS
+        fix or stop_system wakes it. Overdue checks (e.g. stopped vehicle or no
+        frame yet) are retried on the next fix, or every 0.1 s without GPS.
+        """
+        delay = 0.1 if self.gps is None else 1.0
+        if self.interval_type == "time":
+            remaining = self.last_save_time + self.interval_value - time.monotonic()
+            if remaining > 0:
+                delay = remaining
+        self._wake.wait(delay)
+        self._wake.clear()
 
     def toggle_recording(self, record_type='interval', include_video=False):
         """
@@ -329,8 +374,7 @@ class MainApplication:
             try:
                 if include_video:
                     video_path = self.ui.video_dir_var.get()
-                    if not os.path.exists(video_path):
-                        os.makedirs(video_path)
+                    os.makedirs(video_path, exist_ok=True)
                     self.camera.video_writers = self.storage.start_video_recording(video_path)
                 
                 self.recording_state = {
@@ -339,7 +383,7 @@ class MainApplication:
                     'video': include_video
                 }
                 
-                self.last_save_time = time.time()
+                self.last_save_time = time.monotonic()
                 self.ui.show_capture_notification(
                     f"Started {'video ' if include_video else ''}recording ({record_type})"
                 )
@@ -351,9 +395,11 @@ class MainApplication:
         else:
             # Stop recording
             if self.recording_state['video']:
-                if self.camera.video_writers:
-                    self.storage.stop_video_recording(self.camera.video_writers)
+                video_writers = self.camera.video_writers
+                if video_writers:
+                    # Detach first so the writer threads are done before release
                     self.camera.video_writers = None
+                    self.storage.stop_video_recording(video_writers)
                     
             self.recording_state = {
                 'active': False,
@@ -370,6 +416,10 @@ class MainApplication:
 
 def main():
     app = MainApplication()
+    # Move everything allocated during startup (Tk, OpenCV, DepthAI objects)
+    # out of the collector's reach, so collections triggered by per-frame and
+    # per-fix allocations only scan young objects
+    gc.freeze()
     app.run()
 
 
@@ -1,51 +1,180 @@
 import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait
 import cv2
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Dict, Any, Optional, List
 import json
 import numpy as np
 
+try:
+    import orjson  # optional, several times faster than json
+except ImportError:
+    orjson = None
+
+def _format_time(t: float) -> tuple:
+    """
+    Format an epoch time as the file-name stamp ('%Y%m%d_%H%M%S_%f') and as
+    an ISO 8601 local time, from a single localtime() call.
+    """
+    seconds, micros = divmod(round(t * 1e6), 1000000)
+    lt = time.localtime(seconds)
+    ts_str = f"{time.strftime('%Y%m%d_%H%M%S', lt)}_{micros:06d}"
+    iso = f"{time.strftime('%Y-%m-%dT%H:%M:%S', lt)}.{micros:06d}"
+    return ts_str, iso
+
+
+class BitstreamWriter:
+    """
+    Appends an already-encoded H.264 bitstream to a file.
+    Exposes the write/release subset of cv2.VideoWriter so it can sit in the
+    same video_writers dict.
+    Recording usually starts mid-GOP, and the P-frames before the next
+    keyframe cannot be decoded without it. Packets are dropped until the
+    first one carrying an SPS or IDR slice, so a file starts up to one
+    keyframe interval (about 1 s) after recording was requested.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'wb')
+        self._synced = False  # first keyframe written
+
+    def write(self, data) -> None:
+        if not self._synced:
+            if not self._is_keyframe(data):
+                return
+            self._synced = True
+        self._file.write(data)
+
+    @staticmethod
+    def _is_keyframe(data) -> bool:
+        """True if an Annex-B packet holds an SPS (NAL type 7) or IDR slice (type 5)"""
+        buf = bytes(data)
+        start = buf.find(b'\x00\x00\x01')
+        while 0 <= start < len(buf) - 3:
+            if buf[start + 3] & 0x1F in (5, 7):
+                return True
+            start = buf.find(b'\x00\x00\x01', start + 3)
+        return False
+
+    def isOpened(self) -> bool:
+        return not self._file.closed
+
+    def release(self) -> None:
+        if not self._file.closed:
+            self._file.close()
+
+
 class StorageManager:
+    # Captures waiting for the writer thread; beyond this the oldest is dropped
+    IO_QUEUE_SIZE = 8
+    # One encoder per frame type (rgb, depth, depth_raw, ir)
+    ENCODE_WORKERS = 4
+    # Writer statistics are printed this often (seconds)
+    STATS_LOG_INTERVAL = 60
+    # Raw depth is stored as LZW-compressed 16-bit TIFF: lossless, about the
+    # size of a level-1 PNG, but without PNG's filter pass it encodes ~2x faster
+    DEPTH_RAW_PARAMS = [cv2.IMWRITE_TIFF_COMPRESSION, 5]  # 5 = COMPRESSION_LZW
+    # Hardware H.264 for the host-encoded video streams. Matroska stays
+    # playable even if recording is cut off without a clean shutdown.
+    GST_H264_PIPELINE = (
+        'appsrc ! videoconvert ! '
+        'v4l2h264enc extra-controls="controls,video_bitrate={bitrate}" ! '
+        'video/x-h264,level=(string)4 ! h264parse ! matroskamux ! '
+        'filesink location="{path}"'
+    )
+    VIDEO_BITRATE = 4000000  # bits/s per stream
+
     def __init__(self, base_path: str = "result"):
         """Initialize storage manager with base path"""
         self.base_path = base_path
-        self.jpeg_quality = 100  # Maximum JPEG quality
-        self.png_compression = 0  # No PNG compression for maximum quality
+        # q=90 is visually indistinguishable from 100 at about half the size
+        self.jpeg_quality = 90
+        # PNG is lossless at any level; 1 is fast and far smaller than 0 (stored)
+        self.png_compression = 1
+        self._update_encode_params()
+        self._current_day = None  # day current_path was last ensured for
         self._ensure_directory_exists()
 
+        # Captures are encoded and written on a background thread so callers
+        # (save loop, manual capture on the Tk thread) never wait on the disk
+        self.drops = 0  # captures discarded because the writer fell behind
+        self.dropped_frames = {}  # frame type -> frames lost with those captures
+        self.writes = 0  # captures written
+        self._write_ms = deque(maxlen=100)  # recent per-capture write latencies
+        self._io_queue = queue.Queue(maxsize=self.IO_QUEUE_SIZE)
+        # imwrite releases the GIL while encoding, so a capture's frames are
+        # encoded in parallel
+        self._encode_pool = ThreadPoolExecutor(
+            max_workers=self.ENCODE_WORKERS, thread_name_prefix="encode"
+        )
+        self._writer_thread = threading.Thread(target=self._writer_loop, daemon=True)
+        self._writer_thread.start()
+
     def _ensure_directory_exists(self):
-        """Ensure the storage directory exists with date-based organization."""
-        if not os.path.exists(self.base_path):
-            os.makedirs(self.base_path)
+        """
+        Ensure the storage directory exists with date-based organization.
+        The directory is only created again when the day (or base path) changes.
+        """
+        today = time.strftime("%Y%m%d")
+        if today == self._current_day:
+            return
 
-        # Create date-based subdirectory
-        today = datetime.now().strftime("%Y%m%d")
-        self.current_path = os.path.join(self.base_path, today)
-        if not os.path.exists(self.current_path):
-            os.makedirs(self.current_path)
+        # Create date-based subdirectory (and base path along with it)
+        current_path = os.path.join(self.base_path, today)
+        os.makedirs(current_path, exist_ok=True)
+        self.current_path = current_path
+        self._current_day = today
+        # Constant part of every capture record until the next rollover
+        self._storage_info = {
+            'base_path': self.base_path,
+            'capture_date': today
+        }
 
     def set_base_path(self, path: str):
         """Set new base path for storage"""
         self.base_path = path
+        self._current_day = None
         self._ensure_directory_exists()
 
     def get_base_path(self) -> str:
         """Get current base path"""
         return self.base_path
 
-    def set_image_quality(self, jpeg_quality: int = 100, png_compression: int = 0):
+    def set_image_quality(self, jpeg_quality: int = 90, png_compression: int = 1):
         """
         Set image quality parameters
         :param jpeg_quality: 0-100, higher is better quality
-        :param png_compression: 0-9, lower is better quality
+        :param png_compression: 0-9, higher is smaller but slower (PNG is lossless)
         """
         self.jpeg_quality = max(0, min(100, jpeg_quality))
         self.png_compression = max(0, min(9, png_compression))
+        self._update_encode_params()
 
-    def save_frame(self, frame: np.ndarray, frame_type: str, timestamp: datetime) -> str:
+    def _update_encode_params(self):
+        """Build the encoder parameter lists once instead of per saved frame"""
+        # Optimized Huffman tables shrink the file at negligible encode cost
+        self._jpeg_params = [
+            cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality,
+            cv2.IMWRITE_JPEG_OPTIMIZE, 1,
+            cv2.IMWRITE_JPEG_PROGRESSIVE, 0
+        ]
+        self._png_params = [cv2.IMWRITE_PNG_COMPRESSION, self.png_compression]
+        # Constant part of every capture record
+        self._image_quality = {
+            'jpeg_quality': self.jpeg_quality,
+            'png_compression': self.png_compression
+        }
+
+    def save_frame(self, frame: np.ndarray, frame_type: str, ts_str: str) -> str:
         """
         Save a frame with timestamp in high quality.
-        If frame_type is "depth_raw", we store as 16-bit PNG to preserve actual distance data.
+        ts_str is the capture timestamp formatted as '%Y%m%d_%H%M%S_%f', shared
+        by all frames of a capture.
+        If frame_type is "depth_raw", we store as 16-bit TIFF to preserve actual distance data.
         For normal color frames or colorized depth, store as JPG or PNG.
         Returns the saved filepath.
         """
@@ -57,116 +186,209 @@ class StorageManager:
 
         # Create timestamp-based filename to avoid collisions
         # e.g. "depth_20230218_153025" or "depth_raw_20230218_153025"
-        filename = f"{frame_type}_{timestamp.strftime('%Y%m%d_%H%M%S_%f')}"
+        filename = f"{frame_type}_{ts_str}"
 
         if frame_type == 'depth_raw':
-            # We store 16-bit PNG
-            filepath = os.path.join(self.current_path, f"{filename}.png")
+            # We store 16-bit TIFF
+            ext = '.tiff'
             # Make sure frame is 16-bit
             if frame.dtype != np.uint16:
                 # If your pipeline yields 16-bit, it should be np.uint16. Otherwise, convert if needed:
                 frame = frame.astype(np.uint16)
-            cv2.imwrite(filepath, frame, [cv2.IMWRITE_PNG_COMPRESSION, self.png_compression])
+            params = self.DEPTH_RAW_PARAMS
 
         elif frame_type == 'depth':
             # This is likely colorized depth (8-bit). We can store as PNG or JPG:
-            filepath = os.path.join(self.current_path, f"{filename}.png")
-            cv2.imwrite(filepath, frame, [cv2.IMWRITE_PNG_COMPRESSION, self.png_compression])
+            ext = '.png'
+            params = self._png_params
 
         else:
-            # For RGB or IR, store as high-quality JPEG
-            filepath = os.path.join(self.current_path, f"{filename}.jpg")
-            cv2.imwrite(filepath, frame, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+            # For RGB or IR, store as JPEG
+            ext = '.jpg'
+            params = self._jpeg_params
+
+        filepath = os.path.join(self.current_path, filename + ext)
+        # Encode in memory and write the buffer ourselves, so the encoded
+        # bytes are available to the caller without re-reading the file
+        ok, encoded = cv2.imencode(ext, frame, params)
+        if not ok:
+            raise IOError(f"Failed to encode {frame_type} frame")
+        self._write_file(filepath, encoded)
 
         return filepath
 
-    def save_metadata(self, metadata: Dict, filepath: str):
+    @staticmethod
+    def _write_file(filepath: str, data: np.ndarray):
+        """Write an encoded buffer to filepath with raw os.write calls"""
+        view = memoryview(data).cast('B')
+        fd = os.open(filepath, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            while view:
+                view = view[os.write(fd, view):]
+        finally:
+            os.close(fd)
+
+    def _append_ndjson(self, record: Dict):
         """
-        Save metadata to a JSON file with additional information.
+        Append one capture record as a line of captures.jsonl in the day's
+        directory, instead of writing a JSON sidecar per image.
         """
-        enhanced_metadata = {
-            **metadata,
-            'save_timestamp': datetime.now().isoformat(),
-            'image_quality': {
-                'jpeg_quality': self.jpeg_quality,
-                'png_compression': self.png_compression
-            },
-            'file_info': {
-                'original_path': filepath,
-                'filename': os.path.basename(filepath)
-            }
-        }
-
-        # Save metadata with the same base name as the image
-        json_path = filepath.rsplit('.', 1)[0] + '.json'
-        with open(json_path, 'w') as f:
-            json.dump(enhanced_metadata, f, indent=4)
+        if orjson is not None:
+            line = orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE)
+        else:
+            line = (json.dumps(record, separators=(',', ':')) + '\n').encode()
+        with open(os.path.join(self.current_path, 'captures.jsonl'), 'ab') as f:
+            f.write(line)
 
     def save_frames_with_metadata(
         self,
         frames: Dict[str, np.ndarray],
         metadata: Dict,
-        timestamp: Optional[datetime] = None,
+        timestamp: Optional[float] = None,
         capture_type: str = "auto"
-    ) -> List[str]:
+    ) -> None:
         """
-        Save multiple frames with associated metadata.
+        Queue multiple frames with associated metadata for saving.
         Potentially includes RGB, IR, depth (colorized), and depth_raw (16-bit).
-        Returns list of saved file paths.
+        Returns immediately; the writer thread does the encoding and file I/O.
+        Frames must not be modified by the caller after they are queued.
         """
         if timestamp is None:
-            timestamp = datetime.now()
+            timestamp = time.time()
 
-        self._ensure_directory_exists()
+        item = (frames, metadata, timestamp, capture_type)
+        while True:
+            try:
+                self._io_queue.put_nowait(item)
+                return
+            except queue.Full:
+                # Drop the oldest pending capture rather than block the caller
+                try:
+                    dropped_frames = self._io_queue.get_nowait()[0]
+                    self._io_queue.task_done()
+                    self.drops += 1
+                    for frame_type in dropped_frames:
+                        self.dropped_frames[frame_type] = self.dropped_frames.get(frame_type, 0) + 1
+                    print(f"Warning: storage writer behind, dropped capture ({self.drops} total)")
+                except queue.Empty:
+                    pass
 
-        # Prepare extended metadata
-        enhanced_metadata = {
-            **metadata,
-            'capture_type': capture_type,
-            'capture_timestamp': timestamp.isoformat(),
-            'storage_info': {
-                'base_path': self.base_path,
-                'capture_date': timestamp.strftime("%Y%m%d")
-            }
+    def flush(self):
+        """Block until every queued capture has been written"""
+        self._io_queue.join()
+
+    def get_stats(self) -> Dict:
+        """
+        Writer thread statistics: captures written and dropped, median write
+        latency over the last 100 captures, and captures waiting in the queue.
+        """
+        latencies = sorted(self._write_ms)
+        return {
+            'writes': self.writes,
+            'drops': self.drops,
+            'p50_ms': latencies[len(latencies) // 2] if latencies else 0.0,
+            'queue_depth': self._io_queue.qsize(),
+            'dropped_frames': dict(self.dropped_frames)
         }
 
-        saved_files = []
+    def _writer_loop(self):
+        """Writer thread: save queued captures in order"""
+        next_log = time.monotonic() + self.STATS_LOG_INTERVAL
+        while True:
+            if time.monotonic() >= next_log:
+                print(f"Storage writer stats: {self.get_stats()}")
+                next_log += self.STATS_LOG_INTERVAL
+            try:
+                frames, metadata, timestamp, capture_type = self._io_queue.get(timeout=1.0)
+            except queue.Empty:
+                continue
+
+            try:
+                start = time.perf_counter()
+                saved_files = self._write_frames(frames, metadata, timestamp, capture_type)
+                self._write_ms.append((time.perf_counter() - start) * 1000)
+                self.writes += 1
+                print(f"Saved frames: {', '.join([os.path.basename(f) for f in saved_files])}")
+            except Exception as e:
+                print(f"Error in storage writer: {str(e)}")
+            finally:
+                self._io_queue.task_done()
+
+    def _write_frames(
+        self,
+        frames: Dict[str, np.ndarray],
+        metadata: Dict,
+        timestamp: float,
+        capture_type: str
+    ) -> List[str]:
+        """
+        Save multiple frames with associated metadata.
+        Returns list of saved file paths.
+        """
+        self._ensure_directory_exists()
+
+        # Format the capture time once for every file name of this capture
+        ts_str, ts_iso = _format_time(timestamp)
+
+        futures = {}
+        for frame_type, frame in frames.items():
+            if frame is not None:
+                futures[frame_type] = self._encode_pool.submit(self.save_frame, frame, frame_type, ts_str)
+            else:
+                print(f"Warning: Skipping None frame for {frame_type}")
+        # Let every encode finish before collecting, so cleanup sees all files
+        wait(futures.values())
+
         try:
-            for frame_type, frame in frames.items():
-                if frame is not None:
-                    filepath = self.save_frame(frame, frame_type, timestamp)
-                    self.save_metadata(enhanced_metadata, filepath)
-                    saved_files.append(filepath)
-                else:
-                    print(f"Warning: Skipping None frame for {frame_type}")
+            files = {frame_type: future.result() for frame_type, future in futures.items()}
+            # One metadata line per capture, listing all of its frames; only
+            # the per-capture fields are new, the rest is shared and prebuilt
+            self._append_ndjson({
+                **metadata,
+                'capture_type': capture_type,
+                'capture_timestamp': ts_iso,
+                'storage_info': self._storage_info,
+                'save_timestamp': _format_time(time.time())[1],
+                'image_quality': self._image_quality,
+                'files': files
+            })
 
         except Exception as e:
             print(f"Error saving frames: {str(e)}")
             # Optional cleanup if partial saves occurred
-            for fp in saved_files:
+            for future in futures.values():
                 try:
-                    os.remove(fp)
-                    json_path = fp.rsplit('.', 1)[0] + '.json'
-                    if os.path.exists(json_path):
-                        os.remove(json_path)
+                    if future.exception() is None:
+                        os.remove(future.result())
                 except:
                     pass
             raise
 
-        return saved_files
+        return list(files.values())
+
+    def _iter_files(self, path: str):
+        """
+        Recursively yield os.DirEntry objects for the files under path.
+        scandir hands back type and stat information with each entry, so
+        walking a large capture tree costs far fewer stat() calls than
+        os.walk plus os.path.getsize/getctime.
+        """
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    yield from self._iter_files(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    yield entry
 
     def cleanup_old_files(self, days_to_keep: int = 30):
         """
         Delete files older than 'days_to_keep' in the base_path.
         """
         try:
-            current_time = datetime.now()
-            for root, dirs, files in os.walk(self.base_path):
-                for file in files:
-                    filepath = os.path.join(root, file)
-                    file_time = datetime.fromtimestamp(os.path.getctime(filepath))
-                    if (current_time - file_time).days > days_to_keep:
-                        os.remove(filepath)
+            cutoff = (datetime.now() - timedelta(days=days_to_keep + 1)).timestamp()
+            for entry in self._iter_files(self.base_path):
+                if entry.stat().st_mtime <= cutoff:
+                    os.remove(entry.path)
         except Exception as e:
             print(f"Error during cleanup: {str(e)}")
 
@@ -176,11 +398,9 @@ class StorageManager:
         """
         total_size = 0
         file_count = 0
-        for root, dirs, files in os.walk(self.base_path):
-            for file in files:
-                filepath = os.path.join(root, file)
-                total_size += os.path.getsize(filepath)
-                file_count += 1
+        for entry in self._iter_files(self.base_path):
+            total_size += entry.stat().st_size
+            file_count += 1
 
         return {
             'total_size_mb': total_size / (1024 * 1024),
@@ -190,37 +410,32 @@ class StorageManager:
 
     def start_video_recording(self, video_path: str) -> dict:
         """
-        Initialize video writers for RGB, Depth, and IR streams
+        Initialize video writers for RGB, Depth, and IR streams.
+        RGB is a raw H.264 file fed by the on-device encoder; depth and IR are
+        encoded on the host (see _open_video_writer).
         Returns dictionary of video writers
         """
         # Create date-based subdirectory
         timestamp = datetime.now()
         date_subdir = timestamp.strftime("%Y%m%d")
         video_subdir = os.path.join(video_path, date_subdir)
-        
-        if not os.path.exists(video_subdir):
-            os.makedirs(video_subdir)
+        os.makedirs(video_subdir, exist_ok=True)
         
         time_str = timestamp.strftime("%H%M%S")
         video_writers = {}
         
-        # Define video formats and paths
+        # RGB arrives H.264-encoded from the camera and is written as-is
+        video_writers['rgb'] = BitstreamWriter(os.path.join(video_subdir, f'rgb_{time_str}.h264'))
+
+        # Define video formats and paths for the host-encoded streams
         formats = {
-            'rgb': {
-                'path': os.path.join(video_subdir, f'rgb_{time_str}.avi'),
-                'fourcc': cv2.VideoWriter_fourcc(*'XVID'),
-                'fps': 15,
-                'size': (1280, 720)
-            },
             'depth': {
-                'path': os.path.join(video_subdir, f'depth_{time_str}.avi'),
-                'fourcc': cv2.VideoWriter_fourcc(*'XVID'),
+                'path': os.path.join(video_subdir, f'depth_{time_str}'),
                 'fps': 15,
                 'size': (1280, 720)
             },
             'ir': {
-                'path': os.path.join(video_subdir, f'ir_{time_str}.avi'),
-                'fourcc': cv2.VideoWriter_fourcc(*'XVID'),
+                'path': os.path.join(video_subdir, f'ir_{time_str}'),
                 'fps': 15,
                 'size': (1280, 720)
             }
@@ -228,15 +443,31 @@ class StorageManager:
 
         # Create video writers
         for stream, config in formats.items():
-            video_writers[stream] = cv2.VideoWriter(
+            video_writers[stream] = self._open_video_writer(
                 config['path'],
-                config['fourcc'],
                 config['fps'],
                 config['size']
             )
         
         return video_writers
 
+    def _open_video_writer(self, path: str, fps: int, size: tuple):
+        """
+        Open a writer for a host-encoded stream, path given without extension.
+        Uses the V4L2 hardware H.264 encoder (e.g. Raspberry Pi) through
+        GStreamer when OpenCV was built with it, writing .mkv; otherwise falls
+        back to software XVID in .avi.
+        """
+        pipeline = self.GST_H264_PIPELINE.format(
+            bitrate=self.VIDEO_BITRATE, path=path + '.mkv'
+        )
+        writer = cv2.VideoWriter(pipeline, cv2.CAP_GSTREAMER, 0, fps, size, True)
+        if writer.isOpened():
+            return writer
+        writer.release()
+
+        return cv2.VideoWriter(path + '.avi', cv2.VideoWriter_fourcc(*'XVID'), fps, size)
+
     def stop_video_recording(self, video_writers: dict):
         """Release all video writers"""
         for writer in video_writers.values():
@@ -245,8 +476,7 @@ class StorageManager:
 
     def set_video_path(self, path: str):
         """Set path for video storage"""
-        if not os.path.exists(path):
-            os.makedirs(path)
+        os.makedirs(path, exist_ok=True)
         self.video_path = path
 
     def get_video_path(self) -> str:
@@ -2,11 +2,38 @@ import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 from PIL import Image, ImageTk
 import cv2
+import numpy as np
 from typing import Callable, Dict, Any, List
 import os
+import queue
+import re
+import threading
+import time
 import depthai as dai
 
+# Mask entry: exactly four comma-separated integers, e.g. "0,0,100,100"
+_MASK_RE = re.compile(r'^\s*(-?\d+)\s*,\s*(-?\d+)\s*,\s*(-?\d+)\s*,\s*(-?\d+)\s*$')
+
+
 class UIManager:
+    # Default feed redraw rate cap; frames arriving faster are coalesced.
+    # Adjustable at runtime from the Preview FPS slider.
+    MAX_PREVIEW_FPS = 30
+    # How often status updates posted from other threads are applied
+    UPDATE_INTERVAL_MS = 16
+    # Longest side a feed is drawn at. Feeds are 640x480-class previews, so
+    # filling a large fullscreen window only multiplies the pixels uploaded
+    # to Tk each frame without adding detail.
+    PREVIEW_MAX_DIM = 960
+    # Identical error dialogs within this many seconds are shown only once
+    ERROR_REPEAT_WINDOW_S = 2.0
+    # Quiet period after the last <Configure> before feeds are rescaled
+    RESIZE_DEBOUNCE_MS = 100
+    # Scale feeds with OpenCL (cv2.UMat) when a device is available. Off by
+    # default: for preview-sized frames the upload/download can cost more
+    # than the resize it offloads.
+    USE_OPENCL = False
+
     def __init__(self, root: tk.Tk):
         self.root = root
         self.root.title("OAK-D Camera with GPS V1.3")
@@ -52,18 +79,51 @@ class UIManager:
         # State
         self.running = False
         self.available_devices = []
-        
-        # Create UI elements
+        self._device_list = []  # dropdown labels for available_devices
+        self._recent_errors = {}  # (title, message) -> time.monotonic() last shown
+
+        # Tk photo each feed label shows, reused across frames (pasted into
+        # while its size is unchanged)
+        self._photos = {}
+        # Newest scaled RGB frame per stream waiting to be drawn on the Tk thread
+        self._pending_frames = {}
+        # Display buffers reused across frames: the scaled frame per stream
+        # (camera thread only) and a pool of RGB buffers per stream that
+        # cycle between the camera thread and the Tk thread
+        self._scaled_bufs = {}
+        self._free_bufs = {}
+        self._pending_lock = threading.Lock()
+        self._feed_size = (0, 0)  # feed area (width, height per row)
+        self._max_fps = self.MAX_PREVIEW_FPS
+        self._resize_after_id = None
+        # (src height, src width, target width, target height) -> (size, interpolation)
+        self._resize_cache = {}
+        self._use_opencl = self.USE_OPENCL and cv2.ocl.haveOpenCL()
+        # Feeds currently on screen; refreshed on the Tk thread every redraw
+        self._visible_feeds = frozenset()
+        self._gps_text = None  # last text shown on the GPS label
+        self._motion_state = None  # last state shown on the motion label
+        # Widget updates posted by the GPS and save threads, applied on the Tk thread
+        self._ui_queue = queue.SimpleQueue()
+        
+        # Create UI elements with the window hidden, so the geometry managers
+        # lay everything out once instead of after each widget is packed
+        self.root.withdraw()
         self.setup_ui()
+        self.root.update_idletasks()
+        self.root.deiconify()
+        self.root.after(1000 // self._max_fps, self._refresh_frames)
+        self.root.after(self.UPDATE_INTERVAL_MS, self._apply_posted_updates)
         
         # Bind manual capture key
-        self.root.bind('c', lambda e: self._manual_capture_callback() if self._manual_capture_callback else None)
-        self.root.bind('C', lambda e: self._manual_capture_callback() if self._manual_capture_callback else None)
+        self.root.bind('c', self._on_capture_key)
+        self.root.bind('C', self._on_capture_key)
             
     def setup_ui(self):
         """Setup all UI elements"""
         self._setup_left_menu()
         self._setup_right_content()
+        self._build_recording_dialog()
         
     def _setup_left_menu(self):
         """Setup left menu components"""
@@ -116,9 +176,10 @@ class UIManager:
         )
         self.gps_toggle.pack(fill=tk.X, padx=5, pady=2)
         
-        # Save Directory
+        # Save Directory (default output folders live under the working directory)
+        cwd = os.getcwd()
         ttk.Label(self.settings_frame, text="Save Directory:").pack(fill=tk.X, padx=5, pady=(2,0))
-        self.dir_var = tk.StringVar(value=os.path.join(os.getcwd(), "result"))
+        self.dir_var = tk.StringVar(value=os.path.join(cwd, "result"))
         self.dir_entry = ttk.Entry(self.settings_frame, textvariable=self.dir_var)
         self.dir_entry.pack(fill=tk.X, padx=5, pady=2)
         self.dir_btn = ttk.Button(self.settings_frame, text="Browse", command=self._select_directory)
@@ -126,7 +187,7 @@ class UIManager:
 
         # Video Save Directory
         ttk.Label(self.settings_frame, text="Video Save Directory:").pack(fill=tk.X, padx=5, pady=(2,0))
-        self.video_dir_var = tk.StringVar(value=os.path.join(os.getcwd(), "videos"))
+        self.video_dir_var = tk.StringVar(value=os.path.join(cwd, "videos"))
         self.video_dir_entry = ttk.Entry(self.settings_frame, textvariable=self.video_dir_var)
         self.video_dir_entry.pack(fill=tk.X, padx=5, pady=2)
         self.video_dir_btn = ttk.Button(self.settings_frame, text="Browse Video Path", command=self._select_video_directory)
@@ -169,6 +230,18 @@ class UIManager:
         self.mask_btn = ttk.Button(self.settings_frame, text="Apply Mask", command=self._update_mask)
         self.mask_btn.pack(fill=tk.X, padx=5, pady=2)
 
+        # Preview frame rate cap: lower it to save CPU on slow hosts
+        self.preview_fps_label = ttk.Label(self.settings_frame, text=f"Preview FPS: {self.MAX_PREVIEW_FPS}")
+        self.preview_fps_label.pack(fill=tk.X, padx=5, pady=(2,0))
+        self.preview_fps_var = tk.DoubleVar(value=self.MAX_PREVIEW_FPS)
+        ttk.Scale(
+            self.settings_frame,
+            from_=5,
+            to=60,
+            variable=self.preview_fps_var,
+            command=self._on_preview_fps_changed
+        ).pack(fill=tk.X, padx=5, pady=2)
+
         # Control Buttons Frame
         self.control_frame = ttk.LabelFrame(self.left_menu, text="Controls", style='LeftMenu.TLabelframe')
         self.control_frame.pack(fill=tk.X, padx=5, pady=2)
@@ -185,7 +258,7 @@ class UIManager:
         self.capture_btn = ttk.Button(
             self.control_frame,
             text="Manual Capture (C)",
-            command=lambda: self._manual_capture_callback() if self._manual_capture_callback else None
+            command=self._manual_capture
         )
         self.capture_btn.pack(fill=tk.X, padx=5, pady=2)
 
@@ -209,6 +282,21 @@ class UIManager:
         )
         self.motion_label.pack(fill=tk.X, pady=5)
 
+        # Storage writer status
+        self.storage_label = ttk.Label(
+            self.status_frame,
+            text="Storage: Idle",
+            wraplength=250
+        )
+        self.storage_label.pack(fill=tk.X, padx=5, pady=2)
+
+        # Capture notification, packed only while a message is shown
+        self.notification_label = ttk.Label(
+            self.status_frame,
+            foreground='green'
+        )
+        self._notification_after_id = None
+
         # Exit Button
         self.exit_btn = ttk.Button(
             self.control_frame, 
@@ -217,6 +305,11 @@ class UIManager:
         )
         self.exit_btn.pack(fill=tk.X, padx=5, pady=2)
 
+    def _on_preview_fps_changed(self, value):
+        """Apply the Preview FPS slider to the feed redraw schedule"""
+        self._max_fps = int(float(value))
+        self.preview_fps_label.config(text=f"Preview FPS: {self._max_fps}")
+
     def _update_interval_label(self):
         """Update interval label based on selected type"""
         if self.interval_type.get() == "time":
@@ -251,58 +344,194 @@ class UIManager:
         self.ir_label = ttk.Label(self.feeds_container)
         self.ir_label.grid(row=1, column=1, sticky="nsew", padx=2, pady=2)
 
+        self.feeds_container.bind('<Configure>', self._on_feeds_resized)
+
+        # (stream, label, share of the feed width, conversion to RGB or None
+        # to show the frame as grayscale): RGB gets full width, depth and IR
+        # half width each
+        self._feed_specs = (
+            ('rgb', self.rgb_label, 1, cv2.COLOR_BGR2RGB),
+            ('depth', self.depth_label, 2, cv2.COLOR_BGR2RGB),
+            ('ir', self.ir_label, 2, None),
+        )
+
     def update_frames(self, frames: Dict[str, Any]):
-        """Update camera feed displays with balanced scaling"""
-        container_width = self.feeds_container.winfo_width() - 10
-        container_height = (self.feeds_container.winfo_height() - 10) // 2  # Divide by 2 rows
-        
-        if 'rgb' in frames:
-            frame_rgb = cv2.cvtColor(frames['rgb'], cv2.COLOR_BGR2RGB)
-            # RGB gets full width
-            img_rgb = self._resize_frame_balanced(frame_rgb, container_width, container_height)
-            self.rgb_label.configure(image=img_rgb)
-            self.rgb_label.image = img_rgb
-
-        if 'depth' in frames:
-            frame_depth = cv2.cvtColor(frames['depth'], cv2.COLOR_BGR2RGB)
-            # Depth gets half width
-            img_depth = self._resize_frame_balanced(frame_depth, container_width // 2, container_height)
-            self.depth_label.configure(image=img_depth)
-            self.depth_label.image = img_depth
-
-        if 'ir' in frames:
-            frame_ir = cv2.cvtColor(frames['ir'], cv2.COLOR_GRAY2RGB)
-            # IR gets half width
-            img_ir = self._resize_frame_balanced(frame_ir, container_width // 2, container_height)
-            self.ir_label.configure(image=img_ir)
-            self.ir_label.image = img_ir
-
-    def _resize_frame_balanced(self, frame, target_width, target_height):
-        """Resize frame to fit target dimensions while maintaining aspect ratio"""
-        height, width = frame.shape[:2]
-        width_scale = target_width / width
-        height_scale = target_height / height
-        scale = min(width_scale, height_scale) * 0.95  # Use 95% of available space
-        
-        new_width = int(width * scale)
-        new_height = int(height * scale)
-        
-        frame = cv2.resize(frame, (new_width, new_height))
-        return ImageTk.PhotoImage(Image.fromarray(frame))
-    
-    def _resize_frame_compact(self, frame, target_width, target_height):
-        """Resize frame to fit target dimensions while maintaining aspect ratio"""
+        """
+        Hand new camera frames to the display. Safe to call from the camera
+        thread: frames are scaled to their display size and converted to RGB
+        here, off the Tk thread (which also copies them out of the camera's
+        reused buffers), and left for the next _refresh_frames tick, so only
+        the newest frame per stream is drawn. Grayscale feeds are scaled
+        straight into a display buffer and shown without conversion.
+        """
+        container_width, container_height = self._feed_size
+        scaled = {}
+        for name, _, width_divisor, code in self._feed_specs:
+            frame = frames.get(name)
+            # Hidden feeds (window minimized, label not mapped) are not scaled
+            if frame is None or name not in self._visible_feeds:
+                continue
+            target_width = container_width // width_divisor
+            if code is None:
+                fit = self._fit_size(frame.shape[:2], target_width, container_height)
+                if fit is not None:
+                    (new_width, new_height), _ = fit
+                    dst = self._take_display_buffer(name, (new_height, new_width))
+                    scaled[name] = self._resize_frame_balanced(frame, target_width, container_height, dst)
+            else:
+                frame = self._resize_frame_balanced(frame, target_width, container_height,
+                                                    self._scaled_bufs.get(name))
+                if frame is not None:
+                    self._scaled_bufs[name] = frame
+                    rgb = self._take_display_buffer(name, frame.shape[:2] + (3,))
+                    scaled[name] = cv2.cvtColor(frame, code, dst=rgb)
+
+        with self._pending_lock:
+            for name, frame in scaled.items():
+                # A frame the Tk thread never drew goes back to the pool
+                stale = self._pending_frames.get(name)
+                if stale is not None:
+                    self._free_bufs.setdefault(name, []).append(stale)
+                self._pending_frames[name] = frame
+
+    def _take_display_buffer(self, name: str, shape):
+        """Get a pooled RGB buffer for a feed, allocating one if none fits"""
+        with self._pending_lock:
+            free = self._free_bufs.get(name)
+            while free:
+                buf = free.pop()
+                # Buffers from before a resize no longer fit and are dropped
+                if buf.shape == shape:
+                    return buf
+        return np.empty(shape, np.uint8)
+
+    def _refresh_frames(self):
+        """
+        Draw the newest pending frames on the Tk thread, then reschedule. The
+        time spent drawing is taken off the next delay, so redraws keep to
+        the preview frame rate instead of drifting below it.
+        """
+        started = time.perf_counter()
+        with self._pending_lock:
+            frames, self._pending_frames = self._pending_frames, {}
+
+        # winfo_viewable is false for every label while the window is iconified
+        self._visible_feeds = frozenset(
+            name for name, label, _, _ in self._feed_specs if label.winfo_viewable()
+        )
+
+        try:
+            for name, label, _, _ in self._feed_specs:
+                frame = frames.get(name)
+                if frame is not None:
+                    self._show_frame(name, label, frame)
+        finally:
+            # paste() copied the pixels into Tk, so the buffers can be refilled
+            with self._pending_lock:
+                for name, frame in frames.items():
+                    self._free_bufs.setdefault(name, []).append(frame)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            self.root.after(max(1, int(1000 / self._max_fps - elapsed_ms)), self._refresh_frames)
+
+    def post(self, update: Callable, *args):
+        """
+        Run a widget update method (e.g. update_gps_status) on the Tk thread.
+        Safe to call from any thread; Tk itself is not thread-safe. If the
+        same method is posted several times between ticks, only the newest
+        arguments are applied.
+        """
+        self._ui_queue.put((update, args))
+
+    def _apply_posted_updates(self):
+        """Apply the newest posted call of each update method, then reschedule"""
+        latest = {}
+        try:
+            while True:
+                update, args = self._ui_queue.get_nowait()
+                latest[update] = args
+        except queue.Empty:
+            pass
+
+        try:
+            for update, args in latest.items():
+                update(*args)
+        finally:
+            self.root.after(self.UPDATE_INTERVAL_MS, self._apply_posted_updates)
+
+    def _on_feeds_resized(self, event):
+        """
+        Track the feed area size for scaling frames off the Tk thread. A drag
+        resize fires many events; only the size it settles on is applied.
+        """
+        if self._resize_after_id is not None:
+            self.root.after_cancel(self._resize_after_id)
+        self._resize_after_id = self.root.after(
+            self.RESIZE_DEBOUNCE_MS, self._apply_feed_size, event.width, event.height)
+
+    def _apply_feed_size(self, width: int, height: int):
+        self._resize_after_id = None
+        self._feed_size = (width - 10, (height - 10) // 2)  # Divide by 2 rows
+
+    def _show_frame(self, name: str, label: ttk.Label, frame):
+        """
+        Display an RGB or grayscale frame on a feed label. The label keeps its
+        PhotoImage and new pixels are pasted into it; a new one is only created
+        when the displayed size changes (e.g. on window resize).
+        """
+        # Wrap the pooled buffer without copying; paste() copies it into Tk
         height, width = frame.shape[:2]
-        width_scale = target_width / width
-        height_scale = target_height / height
-        scale = min(width_scale, height_scale) * 0.9  # Use 90% of available space
-        
-        new_width = int(width * scale)
-        new_height = int(height * scale)
-        
-        frame = cv2.resize(frame, (new_width, new_height))
-        return ImageTk.PhotoImage(Image.fromarray(frame))
+        mode = 'L' if frame.ndim == 2 else 'RGB'
+        image = Image.frombuffer(mode, (width, height), frame, 'raw', mode, 0, 1)
+        photo = self._photos.get(name)
+        if photo is None or (photo.width(), photo.height()) != image.size:
+            photo = self._photos[name] = ImageTk.PhotoImage(image)
+            label.configure(image=photo)
+        else:
+            photo.paste(image)
+
+    def _resize_frame_balanced(self, frame, target_width, target_height, dst=None):
+        """
+        Resize frame to fit target dimensions while maintaining aspect ratio.
+        The result is written into dst when it has the right shape.
+        Returns None if the target area is empty (window not laid out yet).
+        """
+        fit = self._fit_size(frame.shape[:2], target_width, target_height)
+        if fit is None:
+            return None
+
+        (new_width, new_height), interpolation = fit
+        if self._use_opencl:
+            return cv2.resize(cv2.UMat(frame), (new_width, new_height), interpolation=interpolation).get()
+        if dst is not None and dst.shape != (new_height, new_width) + frame.shape[2:]:
+            dst = None
+        return cv2.resize(frame, (new_width, new_height), dst=dst, interpolation=interpolation)
     
+    def _fit_size(self, shape, target_width, target_height):
+        """
+        Output size and interpolation for scaling a frame of the given
+        (height, width) into the target area, or None if nothing would fit
+        """
+        height, width = shape
+        key = (height, width, target_width, target_height)
+        fit = self._resize_cache.get(key)
+        if fit is None:
+            width_scale = target_width / width
+            height_scale = target_height / height
+            scale = min(width_scale, height_scale) * 0.95  # Use 95% of available space
+            # Never draw a feed larger than PREVIEW_MAX_DIM on its long side
+            scale = min(scale, self.PREVIEW_MAX_DIM / max(height, width))
+
+            new_width = int(width * scale)
+            new_height = int(height * scale)
+            # INTER_AREA averages source pixels when shrinking, avoiding aliasing
+            interpolation = cv2.INTER_AREA if scale < 1 else cv2.INTER_LINEAR
+            fit = self._resize_cache[key] = ((new_width, new_height), interpolation)
+
+        (new_width, new_height), _ = fit
+        if new_width < 1 or new_height < 1:
+            return None
+        return fit
+
     def _toggle_fullscreen(self, event=None):
         """Toggle fullscreen mode while maintaining minimum size"""
         self.is_fullscreen = not self.is_fullscreen
@@ -328,21 +557,26 @@ class UIManager:
         
     def show_capture_notification(self, message: str):
         """Show temporary capture notification"""
-        if hasattr(self, 'notification_label'):
-            self.notification_label.destroy()
-            
-        self.notification_label = ttk.Label(
-            self.status_frame,
-            text=message,
-            foreground='green'
-        )
+        # A new capture restarts the timer of the one still on screen
+        if self._notification_after_id is not None:
+            self.root.after_cancel(self._notification_after_id)
+
+        self.notification_label.configure(text=message)
         self.notification_label.pack(fill=tk.X, padx=5, pady=2)
-    
+
         # Schedule notification removal after 2 seconds
-        self.root.after(2000, lambda: self.notification_label.destroy() if hasattr(self, 'notification_label') else None)
+        self._notification_after_id = self.root.after(2000, self._hide_capture_notification)
+
+    def _hide_capture_notification(self):
+        self._notification_after_id = None
+        self.notification_label.pack_forget()
 
     def update_motion_status(self, is_moving: bool):
         """Update motion status display"""
+        # Motion is re-checked every capture tick but rarely flips
+        if is_moving == self._motion_state:
+            return
+        self._motion_state = is_moving
         status = "Moving" if is_moving else "Stopped"
         color = "green" if is_moving else "red"
         self.motion_label.config(
@@ -350,6 +584,13 @@ class UIManager:
             foreground=color
         )
         
+    def update_storage_stats(self, stats: Dict[str, Any]):
+        """Update storage writer status display"""
+        self.storage_label.config(
+            text=f"Storage: {stats['writes']} saved, {stats['drops']} dropped, "
+                 f"{stats['queue_depth']} queued, {stats['p50_ms']:.0f} ms"
+        )
+
     def set_callbacks(self,
                     start_callback: Callable = None,
                     stop_callback: Callable = None,
@@ -372,6 +613,16 @@ class UIManager:
     def set_manual_capture_callback(self, callback: Callable):
         """Set callback for manual capture"""
         self._manual_capture_callback = callback
+
+    def _manual_capture(self):
+        if self._manual_capture_callback:
+            self._manual_capture_callback()
+
+    def _on_capture_key(self, event):
+        """Capture key handler; ignored while typing into a settings field"""
+        # Combobox and Spinbox are ttk.Entry subclasses
+        if not isinstance(event.widget, (tk.Entry, ttk.Entry)):
+            self._manual_capture()
     
     def _on_device_selected(self, event=None):
         """Handle device selection"""
@@ -381,18 +632,38 @@ class UIManager:
                 self.device_select_callback(self.available_devices[selected_idx])
 
     def _refresh_devices(self):
-        """Handle device refresh"""
+        """
+        Handle device refresh. Device discovery blocks on the network, so it
+        runs on a worker thread and the list is installed on the Tk thread.
+        """
         if self.refresh_devices_callback:
-            self.available_devices = self.refresh_devices_callback()
-            self._update_device_list()
+            self.refresh_btn.config(state='disabled')
+            threading.Thread(target=self._refresh_devices_worker, daemon=True).start()
 
-    def _update_device_list(self):
+    def _refresh_devices_worker(self):
+        """Discover devices and build their labels off the Tk thread"""
+        try:
+            devices = self.refresh_devices_callback()
+            device_list = [f"OAK {device.getMxId()} ({device.state.name})"
+                           for device in devices]
+        except Exception as e:
+            print(f"Error refreshing devices: {e}")
+            devices, device_list = [], []
+        self.post(self._update_device_list, devices, device_list)
+
+    def _update_device_list(self, devices: List, device_list: List[str]):
         """Update the device dropdown list"""
-        device_list = [f"OAK {device.getMxId()} ({device.state.name})" 
-                    for device in self.available_devices]
-        
+        if not self.running:  # settings stay locked while the camera runs
+            self.refresh_btn.config(state='normal')
+        self.available_devices = devices
+        # Same devices in the same states: keep the current selection rather
+        # than re-selecting (and re-querying) the first device
+        if device_list == self._device_list:
+            return
+        self._device_list = device_list
         self.device_combo['values'] = device_list
-        if device_list:
+        # Keep a selected device that is still present (its index may have moved)
+        if device_list and self.device_var.get() not in device_list:
             self.device_combo.set(device_list[0])
             self._on_device_selected()
 
@@ -414,14 +685,12 @@ class UIManager:
 
     def _update_mask(self):
         """Handle mask update"""
-        try:
-            coords = [int(x) for x in self.mask_var.get().split(',')]
-            if len(coords) != 4:
-                raise ValueError("Need exactly 4 coordinates")
-            if self.mask_callback:
-                self.mask_callback(coords)
-        except Exception as e:
-            messagebox.showerror("Error", f"Invalid mask coordinates: {str(e)}")
+        match = _MASK_RE.match(self.mask_var.get())
+        if not match:
+            messagebox.showerror("Error", "Invalid mask coordinates: need exactly 4 integers x1,y1,x2,y2")
+            return
+        if self.mask_callback:
+            self.mask_callback(tuple(int(g) for g in match.groups()))
 
     def _disable_settings(self):
         """Disable settings while camera is running"""
@@ -453,16 +722,31 @@ class UIManager:
         self.gps_enabled.set(enabled)
 
     def show_error(self, title: str, message: str):
-        """Show error message"""
+        """
+        Show error message. The same error repeated within
+        ERROR_REPEAT_WINDOW_S of the last time it was shown is dropped, so a
+        burst of failures opens one modal dialog instead of a stack of them.
+        """
+        now = time.monotonic()
+        key = (title, message)
+        if now - self._recent_errors.get(key, float('-inf')) < self.ERROR_REPEAT_WINDOW_S:
+            return
+        self._recent_errors[key] = now
         messagebox.showerror(title, message)
+        # Time the window from when the dialog is dismissed: errors raised
+        # while it was open would otherwise pop up right after it
+        self._recent_errors[key] = time.monotonic()
     
     def update_gps_status(self, coords: Dict[str, Any]):
         """Update GPS status display"""
         if coords:
             status = f"GPS: {coords['latitude']}°{coords['lat_dir']}, {coords['longitude']}°{coords['lon_dir']}"
-            self.gps_label.config(text=status)
         else:
-            self.gps_label.config(text="GPS: No Fix")
+            status = "GPS: No Fix"
+        # A stationary receiver repeats the same fix; skip the redundant redraw
+        if status != self._gps_text:
+            self.gps_label.config(text=status)
+            self._gps_text = status
 
     def _exit_application(self):
         """Handle application exit"""
@@ -488,8 +772,88 @@ class UIManager:
         if dir_path:
             self.video_dir_var.set(dir_path)
             # Create directory if it doesn't exist
-            if not os.path.exists(dir_path):
-                os.makedirs(dir_path)
+            os.makedirs(dir_path, exist_ok=True)
+
+    def _build_recording_dialog(self):
+        """Build the recording options dialog once; it is shown on each start"""
+        self.recording_dlg = tk.Toplevel(self.root)
+        self.recording_dlg.withdraw()
+        self.recording_dlg.title("Recording Options")
+        self.recording_dlg.geometry("300x200")
+
+        # Recording type
+        type_frame = ttk.LabelFrame(self.recording_dlg, text="Recording Type")
+        type_frame.pack(fill=tk.X, padx=5, pady=5)
+
+        self._record_type_var = tk.StringVar(value="interval")
+        ttk.Radiobutton(
+            type_frame,
+            text="Interval-based",
+            variable=self._record_type_var,
+            value="interval"
+        ).pack(fill=tk.X, padx=5, pady=2)
+
+        ttk.Radiobutton(
+            type_frame,
+            text="Continuous",
+            variable=self._record_type_var,
+            value="continuous"
+        ).pack(fill=tk.X, padx=5, pady=2)
+
+        # Video option
+        self._video_var = tk.BooleanVar(value=True)  # Default to true
+        ttk.Checkbutton(
+            self.recording_dlg,
+            text="Include Video Recording",
+            variable=self._video_var
+        ).pack(fill=tk.X, padx=5, pady=5)
+
+        # Buttons
+        btn_frame = ttk.Frame(self.recording_dlg)
+        btn_frame.pack(fill=tk.X, padx=5, pady=5)
+
+        ttk.Button(
+            btn_frame,
+            text="Start",
+            command=self._start_camera_and_recording
+        ).pack(side=tk.LEFT, padx=5)
+
+        ttk.Button(
+            btn_frame,
+            text="Cancel",
+            command=self.recording_dlg.withdraw
+        ).pack(side=tk.LEFT, padx=5)
+
+        self.recording_dlg.protocol("WM_DELETE_WINDOW", self.recording_dlg.withdraw)
+
+    def _start_camera_and_recording(self):
+        """
+        Start button of the recording options dialog. Opening the device
+        blocks the Tk thread for a moment, so the window is held busy (busy
+        cursor, input swallowed) until the camera is up; clicks made in the
+        meantime would otherwise land on the controls once it returns.
+        """
+        self.recording_dlg.withdraw()
+        self.root.tk.call('tk', 'busy', 'hold', self.main_container)
+        self.root.update_idletasks()
+        try:
+            if self.start_callback:
+                self.start_callback(self._interval_settings)
+            if self.video_callback:
+                self.video_callback(
+                    self._record_type_var.get(),
+                    self._video_var.get()
+                )
+            self.running = True
+            self.control_btn.config(text="Stop Camera")
+            self._disable_settings()
+        except Exception:
+            self.recording_dlg.deiconify()  # let the user retry or cancel
+            raise
+        finally:
+            # Deliver input queued during start-up to the busy window, then drop it
+            self.root.update()
+            self.root.tk.call('tk', 'busy', 'forget', self.main_container)
 
     def _toggle_camera_and_recording(self):
         """Handle camera and recording toggle"""
@@ -499,73 +863,17 @@ class UIManager:
                     messagebox.showerror("Error", "Please select a device first")
                     return
 
-                # Show recording options dialog
-                self.recording_dlg = tk.Toplevel(self.root)
-                self.recording_dlg.title("Recording Options")
-                self.recording_dlg.geometry("300x200")
-                
-                # Recording type
-                type_frame = ttk.LabelFrame(self.recording_dlg, text="Recording Type")
-                type_frame.pack(fill=tk.X, padx=5, pady=5)
-                
-                record_type = tk.StringVar(value="interval")
-                ttk.Radiobutton(
-                    type_frame, 
-                    text="Interval-based", 
-                    variable=record_type, 
-                    value="interval"
-                ).pack(fill=tk.X, padx=5, pady=2)
-                
-                ttk.Radiobutton(
-                    type_frame, 
-                    text="Continuous", 
-                    variable=record_type, 
-                    value="continuous"
-                ).pack(fill=tk.X, padx=5, pady=2)
-                
-                # Video option
-                video_var = tk.BooleanVar(value=True)  # Default to true
-                ttk.Checkbutton(
-                    self.recording_dlg,
-                    text="Include Video Recording",
-                    variable=video_var
-                ).pack(fill=tk.X, padx=5, pady=5)
-                
                 # Get interval settings
                 interval_settings = self.get_interval_settings()
                 if interval_settings['value'] < 1:
                     raise ValueError("Interval must be at least 1 second")
 
-                def start_camera_and_recording():
-                    if self.start_callback:
-                        self.start_callback(interval_settings)
-                    if self.video_callback:
-                        self.video_callback(
-                            record_type.get(),
-                            video_var.get()
-                        )
-                    self.running = True
-                    self.control_btn.config(text="Stop Camera")
-                    self._disable_settings()
-                    self.recording_dlg.destroy()
-                    
-                # Buttons
-                btn_frame = ttk.Frame(self.recording_dlg)
-                btn_frame.pack(fill=tk.X, padx=5, pady=5)
-                
-                ttk.Button(
-                    btn_frame,
-                    text="Start",
-                    command=start_camera_and_recording
-                ).pack(side=tk.LEFT, padx=5)
-                
-                ttk.Button(
-                    btn_frame,
-                    text="Cancel",
-                    command=self.recording_dlg.destroy
-                ).pack(side=tk.LEFT, padx=5)
-                
-                self.recording_dlg.protocol("WM_DELETE_WINDOW", lambda: [self.recording_dlg.destroy(), delattr(self, 'recording_dlg')])
+                # Show recording options dialog with its defaults restored
+                self._interval_settings = interval_settings
+                self._record_type_var.set("interval")
+                self._video_var.set(True)
+                self.recording_dlg.deiconify()
+                self.recording_dlg.lift()
             except ValueError as e:
                 messagebox.showerror("Error", str(e))
         else: